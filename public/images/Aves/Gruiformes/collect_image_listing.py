@@ -1,11 +1,33 @@
+import abc
 import os
 import re
 import sys
-import glob
-from typing import List, Dict, Optional, Tuple
+import time
+import json
+import hashlib
+import codecs
+import csv
+import io
+import sqlite3
+import threading
+import fnmatch
+import heapq
+import argparse
+import functools
+import importlib.util
+import itertools
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple
 
-import pandas as pd
 from bs4 import BeautifulSoup, Tag
+from openpyxl import Workbook
+from lxml import etree, html as lxml_html
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # optional: --watch falls back to polling without it
+    Observer = None
 
 
 CATEGORY_LABELS = [
@@ -19,12 +41,25 @@ CATEGORY_LABELS = [
 STAGE_KEYWORDS = [
     # English
     "male", "female", "chicks", "juvenile", "immature", "immatures",
-    "subadult", "sub-adult", "nest", "nymph", "egg", "eggs", "adult",
+    "subadult", "sub-adult", "nest", "nestling", "nymph", "egg", "eggs", "adult",
     # Spanish common counterparts
     "macho", "hembra", "pichon", "pichones", "juvenil", "inmaduro", "inmaduros",
     "subadulto", "nido", "ninfa", "huevo", "huevos", "adulto", "adultos",
 ]
 
+# Longest stage table text still taken as a header, to avoid long paragraphs
+STAGE_MAX_LENGTH = 120
+
+# One scan per candidate text: whole-word stage keywords (plural -s/-es allowed, so "Machos" still
+# counts but "nest" no longer fires inside "honest" nor "male" inside "animales"), or any digit,
+# which rules the table out as a location/date line
+STAGE_MATCHER = re.compile(
+    r"(?P<digit>\d)|\b(?P<term>"
+    + "|".join(re.escape(kw) for kw in sorted(STAGE_KEYWORDS, key=len, reverse=True))
+    + r")(?:e?s)?\b",
+    re.IGNORECASE,
+)
+
 # Add robust, case-insensitive variant patterns for each category, including common typos
 THREAT_VARIANTS: Dict[str, List[re.Pattern]] = {
     # Near-threatened variations and typos (EN + ES)
@@ -57,427 +92,2256 @@ THREAT_VARIANTS: Dict[str, List[re.Pattern]] = {
 }
 
 
-def read_html_file(path: str) -> Optional[str]:
+def _compile_threat_matcher(suffix: str = "") -> re.Pattern:
+    """Compile THREAT_VARIANTS into one regex, optionally requiring `suffix` after the label.
+    Each category is a lookahead alternative anchored at the start of the text, so categories
+    are tried in THREAT_VARIANTS order (not leftmost-match order), exactly like the old loops.
+    The category that matched is reported through a named group (t0, t1, ...)."""
+    alternatives = []
+    for i, patterns in enumerate(THREAT_VARIANTS.values()):
+        body = "|".join(f"(?:{pat.pattern}){suffix}" for pat in patterns)
+        alternatives.append(f"(?=.*?(?P<t{i}>{body}))")
+    return re.compile(r"\A(?:" + "|".join(alternatives) + ")", re.IGNORECASE | re.DOTALL)
+
+
+THREAT_GROUP_LABELS: Dict[str, str] = {f"t{i}": canonical for i, canonical in enumerate(THREAT_VARIANTS)}
+THREAT_MATCHER = _compile_threat_matcher()
+# "LABEL : X" form, used when the selection marker sits right after the label text
+THREAT_MARKER_MATCHER = _compile_threat_matcher(r"\s*[:\-]?\s*[xX×]")
+
+
+def read_html_bytes(path: str) -> Optional[bytes]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
+        with open(path, "rb") as f:
             return f.read()
-    except UnicodeDecodeError:
-        try:
-            with open(path, "r", encoding="latin-1") as f:
-                return f.read()
-        except Exception as e:
-            print(f"Error reading {path}: {e}")
-            return None
     except Exception as e:
         print(f"Error reading {path}: {e}")
         return None
 
 
+# Like browsers, only the start of a page is searched for a <meta> charset declaration
+SNIFF_PREFIX_BYTES = 4096
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# <meta charset="..."> and <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET_BYTES = re.compile(rb"<meta\b[^>]*?\bcharset\s*=\s*[\"']?\s*([A-Za-z0-9._:\-]+)", re.IGNORECASE)
+
+
+def sniff_encoding(data: bytes) -> Tuple[Optional[str], str]:
+    """Declared encoding of a page and where it came from ("bom" or "meta"), or (None, "")."""
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding, "bom"
+    m = _META_CHARSET_BYTES.search(data, 0, SNIFF_PREFIX_BYTES)
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode("ascii")).name, "meta"
+        except LookupError:
+            pass
+    return None, ""
+
+
+def resolve_encoding(data: bytes, declared: Optional[str], source: str) -> str:
+    """Encoding to parse the page with. A BOM or a non-UTF-8 <meta> charset is trusted;
+    otherwise the page is UTF-8 when it decodes as such and latin-1 when it does not."""
+    if declared and (source == "bom" or declared != "utf-8"):
+        return declared
+    if data.isascii():
+        return "utf-8"
+    try:
+        str(data, "utf-8")
+    except UnicodeDecodeError:
+        return "iso8859-1"
+    return "utf-8"
+
+
+@functools.lru_cache(maxsize=None)
+def _parser_knows_encoding(encoding: str) -> bool:
+    # libxml2 (via iconv) does not know every Python codec name, e.g. "mac-roman"
+    try:
+        etree.fromstring(b"<p></p>", etree.HTMLParser(encoding=encoding))
+    except LookupError:
+        return False
+    return True
+
+
+# Byte markers of something the extractors can use: an 800-wide table (photo frame or its
+# camera/location tables) or an ffn.gif thumbnail cell. A page with neither yields no rows.
+_RELEVANT_BYTES = re.compile(rb"ffn\.gif|<table\b[^>]*\bwidth\s*=\s*[\"']?800", re.IGNORECASE)
+_HEAD_END_BYTES = re.compile(rb"</head\s*>", re.IGNORECASE)
+_TABLE_OPEN_BYTES = re.compile(rb"<table\b", re.IGNORECASE)
+_TABLE_CLOSE_BYTES = re.compile(rb"</table\s*>", re.IGNORECASE)
+
+
+def needs_dom(data: bytes) -> bool:
+    """Cheap byte scan: False when the page cannot produce any row, so it need not be parsed."""
+    return _RELEVANT_BYTES.search(data) is not None
+
+
+def relevant_region(data: bytes) -> Tuple[int, int]:
+    """Byte range of the document the extractors read: from the end of <head> to the last
+    </table>. The tail is only cut when table tags are balanced, so no table loses content."""
+    start, end = 0, len(data)
+    first_table = _TABLE_OPEN_BYTES.search(data)
+    if first_table is None:
+        return start, end
+    head_end = _HEAD_END_BYTES.search(data, 0, first_table.start())
+    if head_end is not None:
+        start = head_end.end()
+    closes = list(_TABLE_CLOSE_BYTES.finditer(data, start))
+    if closes and len(closes) == len(_TABLE_OPEN_BYTES.findall(data, start)):
+        end = closes[-1].end()
+    return start, end
+
+
 def compact_text(text: str) -> str:
     if not text:
         return ""
-    # Replace whitespace (including newlines) with single spaces
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    # Replace whitespace (including newlines) with single spaces; str.split() uses the
+    # same whitespace definition as the \s regex class and drops leading/trailing runs
+    return " ".join(text.split())
+
+
+# Species pages are <PAGE_PREFIX><Slug>.html; the order's cover page (e.g.
+# FotosGruiformes.html) only matches the looser COVER_PAGE_PREFIX
+PAGE_PREFIX = "Fotos_"
+COVER_PAGE_PREFIX = "Fotos"
+LISTING_CHOICES = ("species", "cover", "both")
+# Extra listing files written next to the workbook; csv and jsonl are streamed
+# page by page, the columnar parquet and arrow files need pyarrow
+EXPORT_EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet", "arrow": ".arrow", "pickle": ".pkl"}
+COLUMNAR_EXPORTS = ("parquet", "arrow")
+
+# Listing columns B..P (column A is left empty)
+LISTING_COLUMNS = [
+    "Species_ID",      # Column B
+    "Slug",            # Column C
+    "Subspecies_ID",   # Column D
+    "Slide",           # Column E
+    "Cover",           # Column F
+    "Thumbnail_Filename",  # Column G
+    "Large_Filename",      # Column H
+    "Equipment",           # Column I
+    "Sex_Age",             # Column J
+    "Location",            # Column K
+    "Province",            # Column L
+    "Country",             # Column M
+    "Date",                # Column N
+    "Location_Date",       # Column O
+    "Threat_Status",       # Column P
+]
+
+# Columns with few distinct values, stored dictionary-encoded in the columnar exports
+DICTIONARY_COLUMNS = ("Slug", "Slide", "Equipment", "Sex_Age", "Threat_Status", "Order")
+
+
+
+class ImageRecord:
+    """One image of a page, from the extractors through to the writers.
+
+    The extractors create it, parse_html fills in threat_status and
+    write_listings fills in slug (and order in --root runs) in place, so no
+    image is ever copied into a second record.
+    """
+
+    __slots__ = (
+        "slide", "thumbnail", "large", "equipment", "sex_age", "location_date", "threat_status", "slug", "order",
+    )
+
+    # The fields a parse produces, in the order they are stored in the
+    # manifest, journal, cache and partials
+    PARSED = ("slide", "thumbnail", "large", "equipment", "sex_age", "location_date", "threat_status")
+
+    # Field holding each listing column; the other columns are always empty
+    COLUMN_FIELDS = {
+        "Slug": "slug",
+        "Slide": "slide",
+        "Thumbnail_Filename": "thumbnail",
+        "Large_Filename": "large",
+        "Equipment": "equipment",
+        "Sex_Age": "sex_age",
+        "Location_Date": "location_date",
+        "Threat_Status": "threat_status",
+        "Order": "order",
+    }
+
+    def __init__(
+        self,
+        slide: str,
+        thumbnail: str,
+        large: str,
+        equipment: str,
+        sex_age: str,
+        location_date: str,
+        threat_status: str = "",
+    ):
+        self.slide = slide
+        self.thumbnail = thumbnail
+        self.large = large
+        self.equipment = equipment
+        self.sex_age = sex_age
+        self.location_date = location_date
+        self.threat_status = threat_status
+        self.slug = ""
+        # Order column value, only set in --root runs
+        self.order: Optional[str] = None
+
+    def values(self) -> Tuple[str, ...]:
+        """Listing values (columns B..P, plus Order when set) in LISTING_COLUMNS order."""
+        row = (
+            "",  # Column B Species_ID: EMPTY
+            self.slug,  # Column C Slug: Species_Name values
+            "",  # Column D Subspecies_ID: EMPTY
+            self.slide,  # Column E Slide: "Y" for ffn.gif thumbnails
+            "",  # Column F Cover: EMPTY
+            self.thumbnail,  # Column G Thumbnail_Filename
+            self.large,  # Column H Large_Filename
+            self.equipment,  # Column I Equipment: camera text under the photo
+            self.sex_age,  # Column J Sex_Age
+            "",  # Column K Location: EMPTY
+            "",  # Column L Province: EMPTY
+            "",  # Column M Country: EMPTY
+            "",  # Column N Date: EMPTY
+            self.location_date,  # Column O Location_Date
+            self.threat_status,  # Column P Threat_Status
+        )
+        return row if self.order is None else row + (self.order,)
+
+    def to_json(self) -> List[str]:
+        return [self.slide, self.thumbnail, self.large, self.equipment, self.sex_age, self.location_date, self.threat_status]
+
+    @classmethod
+    def from_json(cls, data: List[str]) -> "ImageRecord":
+        return cls(*data)
+
+
+def records_to_json(records: List[ImageRecord]) -> List[List[str]]:
+    return [r.to_json() for r in records]
 
 
-def get_current_folder_name() -> str:
-    return os.path.basename(os.getcwd().rstrip(os.sep)) or "Image_Listing"
+def records_from_json(data: List[List[str]]) -> List[ImageRecord]:
+    return [ImageRecord.from_json(values) for values in data]
+
+
+def get_folder_name(path: str) -> str:
+    return os.path.basename(os.path.abspath(path).rstrip(os.sep)) or "Image_Listing"
 
 
 def endswith_jpg(value: Optional[str]) -> bool:
     return bool(value) and value.endswith(".jpg")
 
 
-def _match_threat_in_text(text: str) -> str:
+def _bs4_text(node: Tag) -> str:
+    return compact_text(node.get_text(" ", strip=True))
+
+
+def _lxml_text(node) -> str:
+    # Same strings BeautifulSoup.get_text(" ", strip=True) joins: text nodes outside
+    # script/style/template/ruby containers, one separator between each
+    return compact_text(" ".join(_XP_TEXT(node)))
+
+
+class TextCache:
+    """Compact text of document nodes, memoized by node identity for one document."""
+
+    def __init__(self, text_of: Callable = _bs4_text):
+        # Values keep a reference to the node so its id cannot be reused within the document
+        self._texts: Dict[int, Tuple[object, str]] = {}
+        self._text_of = text_of
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, node) -> str:
+        key = id(node)
+        cached = self._texts.get(key)
+        if cached is None:
+            self.misses += 1
+            text = self._text_of(node)
+            self._texts[key] = (node, text)
+            return text
+        self.hits += 1
+        return cached[1]
+
+
+class TableEntry:
+    """One <table> of the document with the attributes the extractors look at."""
+
+    __slots__ = ("position", "node", "width", "border", "is_big_image", "ffn_cells", "siblings", "sibling_pos", "_texts")
+
+    def __init__(self, position: int, node, texts: TextCache):
+        self.position = position
+        self.node = node
+        self.width = node.get("width")
+        try:
+            self.border = int(node.get("border", "0"))
+        except ValueError:
+            self.border = 0
+        # Main photo frame: 800 wide, thick border (e.g., 9), at least one .jpg image
+        self.is_big_image = False
+        # td cells owned by this table (not by a nested one) with an ffn.gif background, in document order
+        self.ffn_cells: List = []
+        # Tables sharing this table's parent, and this table's place among them
+        self.siblings: Optional[SiblingTables] = None
+        self.sibling_pos = 0
+        self._texts = texts
+
+    @property
+    def text(self) -> str:
+        # Compact text of the whole table, computed on first use
+        return self._texts.get(self.node)
+
+
+class SiblingTables:
+    """Tables sharing one parent, in document order, with precomputed photo-block boundaries
+    so a block finds its stage header and its camera/location tables without walking siblings."""
+
+    __slots__ = ("entries", "prev_big", "next_big", "next_text")
+
+    def __init__(self, entries: List[TableEntry]):
+        n = len(entries)
+        self.entries = entries
+        # prev_big[i] / next_big[i]: closest big image table before / after i (-1 / n if none)
+        self.prev_big: List[int] = [-1] * n
+        self.next_big: List[int] = [n] * n
+        # next_text[i]: closest 800-wide border=1 text table after i (n if none)
+        self.next_text: List[int] = [n] * n
+        last = -1
+        for i, entry in enumerate(entries):
+            entry.siblings = self
+            entry.sibling_pos = i
+            self.prev_big[i] = last
+            if entry.is_big_image:
+                last = i
+        big, text = n, n
+        for i in range(n - 1, -1, -1):
+            self.next_big[i] = big
+            self.next_text[i] = text
+            entry = entries[i]
+            if entry.is_big_image:
+                big = i
+            if entry.width == "800" and entry.node.get("border") == "1":
+                text = i
+
+
+class TableIndex:
+    """Ordered index of every table in a BeautifulSoup document, built with a single tree traversal.
+    The extractors only reach the tree through the methods below, so other backends can subclass it."""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.entries: List[TableEntry] = []
+        self.texts = TextCache(_bs4_text)
+        self._by_node: Dict[int, TableEntry] = {}
+        # Depth-first walk; a None marker on the stack closes the innermost open table
+        open_tables: List[TableEntry] = []
+        stack: List[Optional[Tag]] = [c for c in reversed(soup.contents) if isinstance(c, Tag)]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                open_tables.pop()
+                continue
+            name = node.name
+            if name == "table":
+                self._add(node)
+                open_tables.append(self.entries[-1])
+                stack.append(None)
+            elif name == "td" and open_tables:
+                bg = node.get("background")
+                if bg and "ffn.gif" in bg:
+                    # The innermost open table is the one that owns this cell
+                    open_tables[-1].ffn_cells.append(node)
+            elif name == "img" and open_tables:
+                if endswith_jpg(node.get("src")):
+                    for entry in open_tables:
+                        entry.is_big_image = entry.width == "800" and entry.border >= 6
+            stack.extend(c for c in reversed(node.contents) if isinstance(c, Tag))
+        self._link_siblings()
+
+    def _add(self, node) -> TableEntry:
+        entry = TableEntry(len(self.entries), node, self.texts)
+        self.entries.append(entry)
+        self._by_node[id(node)] = entry
+        return entry
+
+    def _parent(self, node):
+        return node.parent
+
+    def _link_siblings(self) -> None:
+        # Document order within one parent is sibling order. The parent is kept alongside its
+        # group because lxml creates parent proxies on demand and could otherwise reuse their ids
+        groups: Dict[int, Tuple[object, List[TableEntry]]] = {}
+        for entry in self.entries:
+            parent = self._parent(entry.node)
+            groups.setdefault(id(parent), (parent, []))[1].append(entry)
+        for _parent, entries in groups.values():
+            SiblingTables(entries)
+
+    def get(self, tbl) -> Optional[TableEntry]:
+        return self._by_node.get(id(tbl))
+
+    def text(self, node) -> str:
+        return self.texts.get(node)
+
+    def header_candidates(self) -> List[TableEntry]:
+        """Tables that may hold the "Globally threatened species" header."""
+        return self.entries
+
+    def rows(self, tbl) -> List:
+        return tbl.find_all("tr")
+
+    def cells(self, tr) -> List:
+        return tr.find_all("td")
+
+    def next_tables(self, tbl) -> Iterator:
+        entry = self._by_node[id(tbl)]
+        siblings = entry.siblings.entries
+        return (siblings[i].node for i in range(entry.sibling_pos + 1, len(siblings)))
+
+    def find_first(self, node, name: str, attr: str):
+        """First descendant <name> element that carries the attribute, or None."""
+        return node.find(name, attrs={attr: True})
+
+    def _name(self, node) -> str:
+        return node.name
+
+    def _children(self, node) -> List:
+        return [c for c in node.contents if isinstance(c, Tag)]
+
+    def grid_rows(self, tbl) -> List[Tuple[object, List]]:
+        """Rows owned directly by the table, each with the td cells it owns.
+        Nested tables are not entered: their rows belong to their own entry, so every
+        cell of the document is visited once however deep the layout nesting is."""
+        rows: List[Tuple[object, List]] = []
+        stack = self._children(tbl)
+        stack.reverse()
+        while stack:
+            node = stack.pop()
+            name = self._name(node)
+            if name == "table":
+                continue
+            if name == "td":
+                if rows:
+                    rows[-1][1].append(node)
+                continue
+            if name == "tr":
+                rows.append((node, []))
+            children = self._children(node)
+            children.reverse()
+            stack.extend(children)
+        return rows
+
+
+# Compiled XPath expressions for the lxml backend
+_XP_TABLES = etree.XPath("//table")
+_XP_BIG_TABLES = etree.XPath(
+    '//table[@width="800"][number(@border) >= 6]'
+    '[.//img[substring(@src, string-length(@src) - 3) = ".jpg"]]'
+)
+_XP_FFN_CELLS = etree.XPath('//td[contains(@background, "ffn.gif")]')
+# Pre-selects header candidates; the exact "globally threatened species" phrase is then checked
+# on the compact text, whose word separation can differ from the XPath string value
+_XP_HEADER_TABLES = etree.XPath('//table[contains(translate(., "GLOBAY", "globay"), "globally")]')
+_XP_TEXT = etree.XPath(
+    "descendant::text()[not(ancestor::script or ancestor::style or ancestor::template"
+    " or ancestor::rt or ancestor::rp)]",
+    smart_strings=False,
+)
+
+
+class LxmlTableIndex(TableIndex):
+    """Table index over a native lxml.html tree, located with compiled XPath expressions."""
+
+    def __init__(self, root):
+        self.entries = []
+        self.texts = TextCache(_lxml_text)
+        self._by_node = {}
+        for node in _XP_TABLES(root):
+            self._add(node)
+        for node in _XP_BIG_TABLES(root):
+            self._by_node[id(node)].is_big_image = True
+        for td in _XP_FFN_CELLS(root):
+            owner = next(td.iterancestors("table"), None)
+            if owner is not None:
+                self._by_node[id(owner)].ffn_cells.append(td)
+        self._headers = [self._by_node[id(node)] for node in _XP_HEADER_TABLES(root)]
+        self._link_siblings()
+
+    def _parent(self, node):
+        return node.getparent()
+
+    def header_candidates(self) -> List[TableEntry]:
+        return self._headers
+
+    def rows(self, tbl) -> List:
+        return list(tbl.iterdescendants("tr"))
+
+    def cells(self, tr) -> List:
+        return list(tr.iterdescendants("td"))
+
+    def find_first(self, node, name: str, attr: str):
+        for el in node.iterdescendants(name):
+            if el.get(attr) is not None:
+                return el
+        return None
+
+    def _name(self, node) -> str:
+        return node.tag
+
+    def _children(self, node) -> List:
+        # Skip comments and processing instructions, whose tag is not a string
+        return [c for c in node if isinstance(c.tag, str)]
+
+
+BACKENDS = ("bs4", "lxml")
+
+
+@functools.lru_cache(maxsize=None)
+def _lxml_parser(encoding: Optional[str]) -> lxml_html.HTMLParser:
+    return lxml_html.HTMLParser(encoding=encoding)
+
+
+def build_table_index(html, backend: str = "bs4", encoding: Optional[str] = None) -> TableIndex:
+    """Parse a page (str, or bytes in the given encoding) and index its tables."""
+    if encoding is not None and not isinstance(html, str) and not _parser_knows_encoding(encoding):
+        html, encoding = str(html, encoding), None
+    if backend == "lxml":
+        try:
+            return LxmlTableIndex(lxml_html.document_fromstring(html, parser=_lxml_parser(encoding)))
+        except etree.ParserError:
+            # lxml refuses empty documents; BeautifulSoup yields a tree without tables
+            return LxmlTableIndex(etree.Element("html"))
+    if encoding is None:
+        return TableIndex(BeautifulSoup(html, "lxml"))
+    return TableIndex(BeautifulSoup(html, "lxml", from_encoding=encoding))
+
+
+def _match_threat_in_text(text: str, matcher: re.Pattern = THREAT_MATCHER) -> str:
     """Return canonical threat label if any variant matches within the given text."""
-    for canonical, patterns in THREAT_VARIANTS.items():
-        for pat in patterns:
-            if pat.search(text):
-                return canonical
-    return ""
+    m = matcher.match(text)
+    return THREAT_GROUP_LABELS[m.lastgroup] if m else ""
 
 
-def _find_status_in_table(table: Tag) -> str:
+def _find_status_in_table(table, index: TableIndex) -> str:
     """Try to detect the selected conservation status in a given table by locating a row
     where a dedicated cell has an 'x' or '×', then mapping that row's text to a known label."""
-    if not isinstance(table, Tag) or table.name != "table":
-        return ""
-    for tr in table.find_all("tr"):
-        tds = tr.find_all("td")
+    for tr in index.rows(table):
+        tds = index.cells(tr)
         if not tds:
             continue
         # Detect a cell that contains only an 'x' (or '×'), ignoring hyphens
         marker_found = False
         for td in tds:
-            td_text = compact_text(td.get_text(" ", strip=True))
+            td_text = index.text(td)
             if td_text.lower() in {"x", "×"}:
                 marker_found = True
                 break
         if not marker_found:
             continue
         # Prefer the rightmost cell's text (often English label). Fallback to full row text.
-        right_text = compact_text(tds[-1].get_text(" ", strip=True))
+        right_text = index.text(tds[-1])
         label = _match_threat_in_text(right_text)
         if label:
             return label
-        row_text = compact_text(tr.get_text(" ", strip=True))
+        row_text = index.text(tr)
         label = _match_threat_in_text(row_text)
         if label:
             return label
     return ""
 
 
-def _looks_like_stage_table(tbl: Tag) -> bool:
-    if not isinstance(tbl, Tag) or tbl.name != "table":
-        return False
-    t = compact_text(tbl.get_text(" ", strip=True))
-    t_lower = t.lower()
-    # Must contain at least one stage keyword and contain no digits (to avoid location/date)
-    if not any(kw in t_lower for kw in STAGE_KEYWORDS):
-        return False
-    if re.search(r"\d", t):
-        return False
+def match_stage_terms(text: str) -> List[str]:
+    """Return the stage keywords found in a candidate header text (lowercased, in order).
+    Empty when the text is too long, contains a digit or has no whole-word stage keyword."""
     # Heuristic: keep it relatively short to avoid long paragraphs
-    if len(t) > 120:
-        return False
-    return True
+    if len(text) > STAGE_MAX_LENGTH:
+        return []
+    terms: List[str] = []
+    for m in STAGE_MATCHER.finditer(text):
+        if m.lastgroup == "digit":
+            return []
+        terms.append(m.group("term").lower())
+    return terms
+
 
+def _looks_like_stage_table(tbl, index: TableIndex) -> bool:
+    return bool(match_stage_terms(index.text(tbl)))
 
-def find_stage_tag_near_table(start_tbl: Tag, max_lookback_tables: int = 3) -> str:
+
+def find_stage_tag_near_table(start_tbl, index: TableIndex, max_lookback_tables: int = 3) -> str:
     """Find a preceding header table indicating sex/age/stage and return its text as-is.
     Looks back among previous sibling tables up to a limit, stopping at the previous big image block."""
-    count = 0
-    for sib in start_tbl.previous_siblings:
-        if not isinstance(sib, Tag) or sib.name != "table":
-            continue
-        # Stop if we hit a previous big image table: do not cross block boundaries
-        try:
-            if is_big_image_table(sib):
-                break
-        except Exception:
-            pass
-        count += 1
-        if _looks_like_stage_table(sib):
-            return compact_text(sib.get_text(" ", strip=True))
-        if count >= max_lookback_tables:
-            break
+    entry = index.get(start_tbl)
+    group, pos = entry.siblings, entry.sibling_pos
+    # Never cross the previous big image table: do not leak into the previous block
+    start = max(group.prev_big[pos] + 1, pos - max_lookback_tables)
+    for i in range(pos - 1, start - 1, -1):
+        sib = group.entries[i].node
+        if _looks_like_stage_table(sib, index):
+            return index.text(sib)
     return ""
 
 
-def find_threat_status(soup: BeautifulSoup) -> str:
+def find_threat_status(index: TableIndex) -> str:
     # Search for table containing the phrase "Globally threatened species"
     target_phrase = "globally threatened species"
-    header_tables: List[Tag] = []
-    for table in soup.find_all("table"):
-        table_text_original = table.get_text(" ", strip=True)
-        table_text = compact_text(table_text_original).lower()
-        if target_phrase in table_text:
-            header_tables.append(table)
+    for entry in index.header_candidates():
+        if target_phrase in entry.text.lower():
+            table = entry.node
             # First, attempt to parse status directly within this table (unlikely but harmless)
-            direct = _find_status_in_table(table)
+            direct = _find_status_in_table(table, index)
             if direct:
                 return direct
             # Then, try the next few sibling tables where the selection is typically shown
             sib_count = 0
-            for sib in table.next_siblings:
-                if not isinstance(sib, Tag) or sib.name != "table":
-                    continue
+            for sib in index.next_tables(table):
                 sib_count += 1
-                status = _find_status_in_table(sib)
+                status = _find_status_in_table(sib, index)
                 if status:
                     return status
                 if sib_count >= 4:
                     break
             # Fallback within header table for patterns like "LABEL : X"
-            for canonical, patterns in THREAT_VARIANTS.items():
-                for pat in patterns:
-                    if re.search(pat.pattern + r"\s*[:\-]?\s*[xX×]", table_text_original, flags=re.IGNORECASE):
-                        return canonical
+            label = _match_threat_in_text(entry.text, THREAT_MARKER_MATCHER)
+            if label:
+                return label
     # Global fallback: scan all tables for an 'x' row and a known label
-    for table in soup.find_all("table"):
-        status = _find_status_in_table(table)
+    for entry in index.entries:
+        status = _find_status_in_table(entry.node, index)
         if status:
             return status
     return ""
 
 
-def is_big_image_table(tbl: Tag) -> bool:
-    if not isinstance(tbl, Tag) or tbl.name != "table":
-        return False
-    width_attr = tbl.get("width")
-    if width_attr != "800":
-        return False
-    # The main photo frame typically has a thick border (e.g., 9)
-    try:
-        border_val = int(tbl.get("border", "0"))
-    except ValueError:
-        border_val = 0
-    if border_val < 6:
-        return False
-    # Must contain at least one <img src="...jpg">
-    return tbl.find("img", src=lambda s: s and endswith_jpg(s)) is not None
-
-
-def find_following_800_text_tables(start_tbl: Tag, max_tables: int = 2) -> List[str]:
+def find_following_800_text_tables(start_tbl, index: TableIndex, max_tables: int = 2) -> List[str]:
     """From the table node, find the next two 800-wide tables (border=1) and return their compact text.
     Returns up to two strings: [camera_equipment, location_date]."""
     results: List[str] = []
-    for sib in start_tbl.next_siblings:
-        if not isinstance(sib, Tag):
-            continue
-        if sib.name != "table":
-            continue
-        if sib.get("width") == "800" and sib.get("border") == "1":
-            results.append(compact_text(sib.get_text(" ", strip=True)))
-            if len(results) >= max_tables:
-                break
-        # Stop if we encounter another big photo frame to avoid leaking into subsequent blocks
-        try:
-            if is_big_image_table(sib):
-                break
-        except Exception:
-            pass
+    entry = index.get(start_tbl)
+    group = entry.siblings
+    # Stop at the next big photo frame to avoid leaking into subsequent blocks
+    end = group.next_big[entry.sibling_pos]
+    i = group.next_text[entry.sibling_pos]
+    while i < end and len(results) < max_tables:
+        results.append(index.text(group.entries[i].node))
+        i = group.next_text[i]
     return results
 
 
-def extract_first_img_and_anchor(table: Tag) -> Tuple[Optional[str], Optional[str]]:
+def extract_first_img_and_anchor(table, index: TableIndex) -> Tuple[Optional[str], Optional[str]]:
     """Return (thumbnail_src, large_href) from the first image region inside the table.
     If anchor is missing, large_href will be None."""
     # Prefer an anchor wrapping an image
-    a_tag = table.find("a", href=True)
-    if a_tag:
-        img_tag = a_tag.find("img", src=True)
-        if img_tag and endswith_jpg(img_tag.get("src")):
+    a_tag = index.find_first(table, "a", "href")
+    if a_tag is not None:
+        img_tag = index.find_first(a_tag, "img", "src")
+        if img_tag is not None and endswith_jpg(img_tag.get("src")):
             thumb = img_tag.get("src")
             large = a_tag.get("href") if endswith_jpg(a_tag.get("href")) else None
             return thumb, large
     # Fallback: any image
-    img_tag = table.find("img", src=True)
-    if img_tag and endswith_jpg(img_tag.get("src")):
+    img_tag = index.find_first(table, "img", "src")
+    if img_tag is not None and endswith_jpg(img_tag.get("src")):
         return img_tag.get("src"), None
     return None, None
 
 
-def parse_big_blocks(soup: BeautifulSoup) -> List[Dict[str, str]]:
-    rows: List[Dict[str, str]] = []
-    for tbl in soup.find_all("table"):
-        if not is_big_image_table(tbl):
+def parse_big_blocks(index: TableIndex) -> List[ImageRecord]:
+    rows: List[ImageRecord] = []
+    for entry in index.entries:
+        if not entry.is_big_image:
             continue
-        thumb, large = extract_first_img_and_anchor(tbl)
+        tbl = entry.node
+        thumb, large = extract_first_img_and_anchor(tbl, index)
         if not thumb:  # Enforce only .jpg thumbnails
             continue
         camera, location = "", ""
-        follow_texts = find_following_800_text_tables(tbl, max_tables=2)
+        follow_texts = find_following_800_text_tables(tbl, index, max_tables=2)
         if len(follow_texts) >= 1:
             camera = follow_texts[0]
         if len(follow_texts) >= 2:
             location = follow_texts[1]
         # Stage label must be immediately related to this block; do a strict lookup
-        stage_label = find_stage_tag_near_table(tbl)
-        rows.append({
-            "Is_Small_ffn_gif": "",
-            "Thumbnail_File": thumb,
-            "Large_File": large or "",
-            "Camera_Equipment": camera,
-            "Location_Date": location,
-            "Sex_Age": stage_label,
-        })
+        stage_label = find_stage_tag_near_table(tbl, index)
+        rows.append(ImageRecord(
+            slide="",
+            thumbnail=thumb,
+            large=large or "",
+            equipment=camera,
+            sex_age=stage_label,
+            location_date=location,
+        ))
     return rows
 
 
-def parse_small_ffn_tables(soup: BeautifulSoup) -> List[Dict[str, str]]:
-    rows: List[Dict[str, str]] = []
-    # Find tables that contain any td with background including 'ffn.gif'
-    for tbl in soup.find_all("table"):
-        ffn_cells = tbl.find_all(lambda tag: isinstance(tag, Tag) and tag.name == "td" and tag.get("background") and "ffn.gif" in tag.get("background"))
-        if not ffn_cells:
+def _span_attr(td, name: str) -> int:
+    value = td.get(name)
+    try:
+        return max(1, int(value)) if value else 1
+    except ValueError:
+        return 1
+
+
+def _is_ffn_cell(td) -> bool:
+    bg = td.get("background")
+    return bool(bg) and "ffn.gif" in bg
+
+
+class CaptionGrid:
+    """Caption text per column of one thumbnail table, laid out on the HTML table grid.
+    Cells are placed honouring colspan and rowspan; captions live in one array indexed by
+    column, updated in place, so a thumbnail finds its caption with a direct lookup."""
+
+    def __init__(self):
+        # Most recent caption per column, from the nearest previous text row(s)
+        self.captions: List[str] = []
+        # Rows each column stays covered by a rowspan cell from above, and that cell's text
+        self._carry: List[int] = []
+        self._carry_text: List[str] = []
+        # Reusable buffers for the row being laid out
+        self._row: List[str] = []
+        self._covered: List[bool] = []
+
+    def place_row(self, tds: List, index: TableIndex, with_text: bool) -> List[int]:
+        """Lay out one row and return the start column of each of its cells.
+        Cell texts are only read when with_text is set (or for cells spanning later rows)."""
+        carry, carry_text = self._carry, self._carry_text
+        row, covered = self._row, self._covered
+        del row[:]
+        del covered[:]
+        width = 0
+        for c, rows_left in enumerate(carry):
+            if rows_left:
+                row.append(carry_text[c])
+                covered.append(True)
+                width = c + 1
+            else:
+                row.append("")
+                covered.append(False)
+        starts: List[int] = []
+        spans: List[Tuple[int, int, int, str]] = []
+        col = 0
+        for td in tds:
+            # Skip the columns still occupied by rowspan cells from previous rows
+            while col < len(covered) and covered[col]:
+                col += 1
+            end = col + _span_attr(td, "colspan")
+            rowspan = _span_attr(td, "rowspan")
+            text = index.text(td) if with_text or rowspan > 1 else ""
+            if end > len(row):
+                row.extend([""] * (end - len(row)))
+                covered.extend([False] * (end - len(covered)))
+            for c in range(col, end):
+                row[c] = text
+            starts.append(col)
+            if rowspan > 1:
+                spans.append((col, end, rowspan - 1, text))
+            col = end
+            width = max(width, end)
+        del row[width:]
+        del covered[width:]
+        # Age the rowspans from previous rows, then register the ones starting on this row
+        for c, rows_left in enumerate(carry):
+            if rows_left:
+                carry[c] = rows_left - 1
+        for start, end, rows_left, text in spans:
+            if end > len(carry):
+                carry.extend([0] * (end - len(carry)))
+                carry_text.extend([""] * (end - len(carry_text)))
+            for c in range(start, end):
+                carry[c] = rows_left
+                carry_text[c] = text
+        return starts
+
+    def merge_text_row(self) -> None:
+        """Fold the row laid out last (a row without thumbnails) into the captions."""
+        row, covered, captions = self._row, self._covered, self.captions
+        if not any(row):
+            # Empty row: reset to avoid bleed-through
+            del captions[:]
+        elif captions and len(captions) == len(row):
+            # Combine stacked text rows per column; a rowspan cell was merged on its first row
+            for c, cur in enumerate(row):
+                if covered[c] or not cur:
+                    continue
+                prev = captions[c]
+                captions[c] = f"{prev} {cur}" if prev else cur
+        else:
+            captions[:] = row
+
+    def caption(self, col: int) -> str:
+        return self.captions[col] if col < len(self.captions) else ""
+
+
+def parse_small_ffn_tables(index: TableIndex) -> List[ImageRecord]:
+    rows: List[ImageRecord] = []
+    # Tables that own any td with background including 'ffn.gif'; an outer layout table
+    # around a thumbnail grid is skipped, the grid is handled through its own entry
+    for entry in index.entries:
+        if not entry.ffn_cells:
             continue
-        # Keep track of the most recent per-column texts from the nearest previous text row(s)
-        last_text_by_column: List[str] = []
-        stage_label_for_table = find_stage_tag_near_table(tbl)
-        for tr in tbl.find_all("tr"):
+        tbl = entry.node
+        grid = CaptionGrid()
+        stage_label_for_table = find_stage_tag_near_table(tbl, index)
+        for _tr, tds in index.grid_rows(tbl):
             # Determine if row has any ffn.gif cells
-            tds = tr.find_all("td")
-            has_ffn = any(td.get("background") and "ffn.gif" in td.get("background") for td in tds)
-
-            # Build expanded per-column texts for this row based on colspan
-            expanded_texts: List[str] = []
-            for td in tds:
-                colspan_val = td.get("colspan")
-                try:
-                    colspan = int(colspan_val) if colspan_val else 1
-                except ValueError:
-                    colspan = 1
-                cell_text = compact_text(td.get_text(" ", strip=True))
-                # Expand text across its spanned columns
-                expanded_texts.extend([cell_text] * max(1, colspan))
-
+            has_ffn = any(_is_ffn_cell(td) for td in tds)
+            starts = grid.place_row(tds, index, with_text=not has_ffn)
             if not has_ffn:
-                # If there's meaningful text, update the last_text_by_column; else, reset to avoid bleed-through
-                if any(txt for txt in expanded_texts):
-                    if last_text_by_column and len(last_text_by_column) == len(expanded_texts):
-                        # Combine stacked text rows per column
-                        combined: List[str] = []
-                        for prev, cur in zip(last_text_by_column, expanded_texts):
-                            if prev and cur:
-                                combined.append(f"{prev} {cur}")
-                            else:
-                                combined.append(prev or cur)
-                        last_text_by_column = combined
-                    else:
-                        last_text_by_column = expanded_texts
-                else:
-                    last_text_by_column = []
+                grid.merge_text_row()
                 continue
 
             # Row with ffn.gif image cells: assign per-image text using column alignment
-            col_index_pointer = 0
-            for td in tds:
-                colspan_val = td.get("colspan")
-                try:
-                    colspan = int(colspan_val) if colspan_val else 1
-                except ValueError:
-                    colspan = 1
-
-                bg = td.get("background", "")
-                if "ffn.gif" in bg:
-                    # Find anchor/img inside this cell
-                    a_tag = td.find("a", href=True)
-                    img_tag = td.find("img", src=True)
-                    thumb: Optional[str] = None
-                    large: Optional[str] = None
-                    if img_tag and endswith_jpg(img_tag.get("src")):
-                        thumb = img_tag.get("src")
-                    if a_tag and endswith_jpg(a_tag.get("href")):
-                        large = a_tag.get("href")
-                    if thumb:
-                        per_cell_text = last_text_by_column[col_index_pointer] if col_index_pointer < len(last_text_by_column) else ""
-                        rows.append({
-                            "Is_Small_ffn_gif": "Y",
-                            "Thumbnail_File": thumb,
-                            "Large_File": large or "",
-                            "Camera_Equipment": "",
-                            "Location_Date": per_cell_text,
-                            "Sex_Age": stage_label_for_table,
-                        })
-                # Advance the column pointer by this cell's colspan
-                col_index_pointer += max(1, colspan)
+            for td, col in zip(tds, starts):
+                if not _is_ffn_cell(td):
+                    continue
+                # Find anchor/img inside this cell
+                a_tag = index.find_first(td, "a", "href")
+                img_tag = index.find_first(td, "img", "src")
+                thumb: Optional[str] = None
+                large: Optional[str] = None
+                if img_tag is not None and endswith_jpg(img_tag.get("src")):
+                    thumb = img_tag.get("src")
+                if a_tag is not None and endswith_jpg(a_tag.get("href")):
+                    large = a_tag.get("href")
+                if thumb:
+                    rows.append(ImageRecord(
+                        slide="Y",
+                        thumbnail=thumb,
+                        large=large or "",
+                        equipment="",
+                        sex_age=stage_label_for_table,
+                        location_date=grid.caption(col),
+                    ))
     return rows
 
 
-def parse_file(path: str) -> List[Dict[str, str]]:
-    html = read_html_file(path)
-    if html is None:
+def parse_file(path: str, stats: Optional[Dict[str, int]] = None, backend: str = "bs4") -> List[ImageRecord]:
+    """Extract image rows from one page with the given backend ("bs4" or "lxml").
+    If a stats dict is given, per-file counters are added to it."""
+    data = read_html_bytes(path)
+    if data is None:
         return []
-    soup = BeautifulSoup(html, "lxml")
+    return parse_html(data, stats, backend)
+
+
+def parse_html(data: bytes, stats: Optional[Dict[str, int]] = None, backend: str = "bs4") -> List[ImageRecord]:
+    """Extract image rows from the raw bytes of one page (see parse_file)."""
+    bytes_read = len(data)
+    t0 = time.perf_counter_ns()
+    declared, source = sniff_encoding(data)
+    if declared in ("utf-16-le", "utf-16-be"):
+        # The byte scans below look for ASCII markup; bring UTF-16 pages to UTF-8 once
+        data = data[len(codecs.BOM_UTF16_LE):].decode(declared).encode("utf-8")
+        declared = "utf-8"
+    decode_ns = time.perf_counter_ns() - t0
+    if stats is not None:
+        stats["bytes_read"] = bytes_read
+    if not needs_dom(data):
+        if stats is not None:
+            stats["dom_skipped"] = 1
+            stats["bytes_avoided"] = len(data)
+            stats["decode_ns"] = decode_ns
+        return []
+    start, end = relevant_region(data)
+    # The parser gets the bytes with their encoding; only slice when the region is smaller
+    markup = data if (start, end) == (0, len(data)) else data[start:end]
+    t0 = time.perf_counter_ns()
+    encoding = resolve_encoding(markup, declared, source)
+    decode_ns += time.perf_counter_ns() - t0
+    if stats is not None:
+        stats["bytes_avoided"] = len(data) - (end - start)
+        stats["decode_ns"] = decode_ns
+        stats["latin1_fallback"] = int(encoding == "iso8859-1" and source != "meta")
+    # Walk the tree once; the extractors below all read from this table index
+    index = build_table_index(markup, backend, encoding)
 
     # Threat status (one per file)
-    threat = find_threat_status(soup)
+    threat = find_threat_status(index)
 
     # Collect big 800-px blocks
-    rows_big = parse_big_blocks(soup)
+    rows_big = parse_big_blocks(index)
 
     # Collect small ffn.gif groups
-    rows_small = parse_small_ffn_tables(soup)
+    rows_small = parse_small_ffn_tables(index)
 
     # Merge and attach threat status
     all_rows = rows_big + rows_small
     for r in all_rows:
-        r["Threat_Status"] = threat
+        r.threat_status = threat
+    if stats is not None:
+        stats["text_cache_hits"] = index.texts.hits
+        stats["text_cache_misses"] = index.texts.misses
     return all_rows
 
 
-def main() -> int:
-    cwd = os.getcwd()
-    folder_name = get_current_folder_name()
-    pattern = os.path.join(cwd, "Fotos_*.html")
-    files = [f for f in glob.glob(pattern) if os.path.isfile(f)]
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collect the image listing of the species pages in the current folder.")
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default="bs4",
+        help="HTML extraction backend: BeautifulSoup (default) or native lxml with XPath",
+    )
+    parser.add_argument(
+        "--listing", choices=LISTING_CHOICES, default="species",
+        help="species pages only (Fotos_*.html, default), with the cover page too (Fotos*.html), "
+        "or both listings from one parse",
+    )
+    parser.add_argument(
+        "--root", metavar="DIR",
+        help="crawl every order folder under DIR (e.g. public/images) and write one catalog with an Order column",
+    )
+    parser.add_argument(
+        "--shard", type=parse_shard, metavar="i/N",
+        help="parse only shard i of N of the pages and write a partial listing for --merge",
+    )
+    parser.add_argument(
+        "--shard-by", choices=("hash", "size"), default="hash",
+        help="split pages by stable path hash (default) or balance them by size",
+    )
+    parser.add_argument(
+        "--merge", nargs="+", metavar="PARTIAL",
+        help="merge the partial listings written by --shard runs into the final workbook(s) and exit",
+    )
+    parser.add_argument(
+        "--export", action="append", choices=sorted(EXPORT_EXTENSIONS), default=[], metavar="FORMAT",
+        help="also write the listing(s) as csv or jsonl (flushed after every page, so they can be followed "
+        "during the run), parquet or arrow (Arrow IPC, memory-mappable; needs pyarrow) files, or a pickled "
+        "pandas DataFrame (pickle; needs pandas); can be repeated",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="parse pages in N worker processes (0 = one per CPU); output order is unchanged",
+    )
+    parser.add_argument(
+        "--prefetch", type=int, default=PREFETCH_DEPTH, metavar="N",
+        help=f"read up to N pages ahead of the parser in serial runs (default {PREFETCH_DEPTH}, 0 = off)",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="ignore the manifest of the previous run and parse every page again",
+    )
+    parser.add_argument(
+        "--cache", metavar="FILE",
+        help="SQLite parse-result cache shared across trees, keyed by page content and parser version",
+    )
+    parser.add_argument(
+        "--cache-max-mb", type=float, default=64, metavar="MB",
+        help="evict least recently used cache entries beyond this size (default 64)",
+    )
+    parser.add_argument(
+        "--invalidate-cache", action="store_true",
+        help="empty the --cache file and exit (e.g. after changing the extraction code)",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="keep running and rewrite the listing whenever species pages change",
+    )
+    args = parser.parse_args(argv)
+    if args.invalidate_cache and not args.cache:
+        parser.error("--invalidate-cache needs --cache FILE")
+    args.export = list(dict.fromkeys(args.export))
+    columnar = [fmt for fmt in args.export if fmt in COLUMNAR_EXPORTS]
+    if columnar and importlib.util.find_spec("pyarrow") is None:
+        parser.error(f"--export {columnar[0]} needs pyarrow (pip install pyarrow)")
+    if "pickle" in args.export and importlib.util.find_spec("pandas") is None:
+        parser.error("--export pickle needs pandas (pip install pandas)")
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
 
-    if not files:
-        print("No matching HTML files (Fotos_*.html) found in current folder.")
-        return 0
 
-    print(f"Found {len(files)} file(s) to process.")
+def species_for_page(filename: str, prefix: str = PAGE_PREFIX) -> Optional[str]:
+    """Slug of a page file name matching <prefix>*.html, or None for any other name."""
+    if not fnmatch.fnmatch(filename, prefix + "*.html"):
+        return None
+    base = os.path.splitext(filename)[0]
+    if not base.startswith(prefix):
+        return None
+    return base.split(prefix, 1)[1]
+
+
+def find_species_pages(folder: str, prefix: str = PAGE_PREFIX) -> List[str]:
+    """Paths of the pages matching <prefix>*.html directly inside a folder, sorted."""
+    with os.scandir(folder) as it:
+        return sorted(e.path for e in it if e.is_file() and species_for_page(e.name, prefix) is not None)
+
+
+def listing_outputs(listing: str) -> List[Tuple[str, str]]:
+    """(page prefix, workbook name suffix) of each listing a --listing choice writes.
+
+    "species" lists the Fotos_*.html pages and "cover" also the cover page;
+    both go to <folder>_Image_Listing.xlsx as Collect.bat and
+    Collect_Include_Cover.bat always did. "both" writes the two listings side
+    by side from a single parse of the pages.
+    """
+    if listing == "both":
+        return [(PAGE_PREFIX, "_Image_Listing.xlsx"), (COVER_PAGE_PREFIX, "_Image_Listing_Include_Cover.xlsx")]
+    return [(COVER_PAGE_PREFIX if listing == "cover" else PAGE_PREFIX, "_Image_Listing.xlsx")]
+
+
+def pages_prefix(outputs: List[Tuple[str, str]]) -> str:
+    """The loosest prefix of the outputs: its pages are the union of theirs."""
+    return min((prefix for prefix, _ in outputs), key=len)
+
+
+def find_order_folders(root: str, prefix: str = PAGE_PREFIX) -> List[str]:
+    """Folders under root (public/images/<Class>/<Order>/ on the site) holding species pages,
+    in sorted depth-first order. Uses a single os.scandir pass per directory."""
+    folders: List[str] = []
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        subdirs: List[str] = []
+        has_pages = False
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        subdirs.append(e.path)
+                    elif not has_pages and e.is_file() and species_for_page(e.name, prefix) is not None:
+                        has_pages = True
+        except OSError as e:
+            print(f"Error scanning {folder}: {e}")
+            continue
+        if has_pages:
+            folders.append(folder)
+        stack.extend(sorted(subdirs, reverse=True))
+    return folders
+
+
+# Rows, stats, sha256 of the page bytes (None if unreadable) and whether the rows came from the cache
+PageResult = Tuple[List[ImageRecord], Dict[str, int], Optional[str], bool]
+
+
+def parse_page_data(data: Optional[bytes], backend: str, cache: Optional["ParseCache"] = None) -> PageResult:
+    """Hash one page's bytes, then take its rows from cache or parse them.
+    The hash comes from the bytes that are parsed, so each page is read once."""
+    if data is None:
+        return [], {}, None, False
+    sha256 = hashlib.sha256(data).hexdigest()
+    if cache is not None:
+        hit = cache.get(sha256, backend)
+        if hit is not None:
+            return hit[0], hit[1], sha256, True
+    stats: Dict[str, int] = {}
+    t0 = time.perf_counter_ns()
+    rows = parse_html(data, stats, backend)
+    stats["parse_ns"] = time.perf_counter_ns() - t0
+    return rows, stats, sha256, False
+
+
+# Each pool worker opens the parse cache once, on a connection of its own
+_worker_caches: Dict[str, Optional["ParseCache"]] = {}
+
+
+def _parse_page(task: Tuple[str, str, Optional[str]]) -> PageResult:
+    """Pool worker: read and parse one page, looking it up in the cache file
+    first when one is given (module level so it pickles)."""
+    path, backend, cache_path = task
+    cache = None
+    if cache_path is not None:
+        if cache_path not in _worker_caches:
+            try:
+                _worker_caches[cache_path] = ParseCache(cache_path)
+            except (OSError, sqlite3.Error):
+                _worker_caches[cache_path] = None
+        cache = _worker_caches[cache_path]
+    return parse_page_data(read_html_bytes(path), backend, cache)
+
+
+def timings_path(out_path: str) -> str:
+    """Per-file parse timings are kept next to the workbook they were recorded for."""
+    return os.path.splitext(out_path)[0] + "_Timings.json"
+
+
+def load_timings(path: str) -> Dict[str, float]:
+    """Historical parse times in ms, keyed by page path relative to the timings file."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    base = os.path.dirname(os.path.abspath(path))
+    # normpath turns the stored "/" back into os.sep, matching os.path.abspath() keys
+    return {
+        os.path.normpath(os.path.join(base, rel)): float(ms) for rel, ms in data.items() if isinstance(ms, (int, float))
+    }
+
+
+def save_timings(path: str, timings: Dict[str, float]) -> None:
+    base = os.path.dirname(os.path.abspath(path))
+    data = {os.path.relpath(p, base).replace(os.sep, "/"): round(ms, 3) for p, ms in sorted(timings.items())}
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"Error writing timings {path}: {e}")
+
+
+def schedule_largest_first(files: List[str], timings: Optional[Dict[str, float]] = None) -> List[int]:
+    """Indexes of files, most expensive first.
+
+    Cost is the historical parse time when one is recorded; other pages are
+    estimated from their size at the ms-per-byte rate of the timed ones (or
+    by size alone when nothing is timed yet). Ties keep the input order.
+    """
+    timings = timings or {}
+    sizes: List[int] = []
+    for path in files:
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(0)
+    timed = [(timings[os.path.abspath(p)], size) for p, size in zip(files, sizes) if os.path.abspath(p) in timings]
+    timed_bytes = sum(size for _, size in timed)
+    rate = sum(ms for ms, _ in timed) / timed_bytes if timed_bytes else 1.0
+    costs = [timings.get(os.path.abspath(p), size * rate) for p, size in zip(files, sizes)]
+    return sorted(range(len(files)), key=lambda i: -costs[i])
+
+
+class PageLog:
+    """JSON lines file of finished pages: a header line, then one line per page
+    with its manifest entry (path relative to the file, size, mtime, hash,
+    stats and rows).
 
-    records: List[Dict[str, str]] = []
-    for path in sorted(files):
+    Only an index is kept in memory: entries holds each page's entry without
+    its rows, plus the byte offset of its line, and rows() reads the rows back
+    when a page is reused. Memory therefore grows with the number of pages,
+    not with the number of images on them.
+    """
+
+    def __init__(self, path: str, header: Dict):
+        self.path = path
+        self.base = os.path.dirname(os.path.abspath(path))
+        self.header = header
+        self._reader = None
+        # End of the last complete line _load() read
+        self._good_end = 0
+
+    def _load(self) -> Dict[str, Dict]:
+        entries: Dict[str, Dict] = {}
+        try:
+            with open(self.path, "rb") as f:
+                line = f.readline()
+                if json.loads(line or b"null") != self.header:
+                    return {}
+                offset = self._good_end = len(line)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # cut off mid-write by an interruption
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    del entry["rows"]
+                    entry["offset"] = offset
+                    entries[os.path.normpath(os.path.join(self.base, entry.pop("path")))] = entry
+                    offset = self._good_end = offset + len(line)
+        except (OSError, ValueError):
+            return {}
+        return entries
+
+    def rows(self, entry: Dict) -> List[ImageRecord]:
+        """The rows of an indexed entry, read back from the file."""
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(entry["offset"])
+        return records_from_json(json.loads(self._reader.readline())["rows"])
+
+    def _write(self, f, path: str, entry: Dict) -> Dict:
+        """Write one page's line to f and return its index entry."""
+        rel = os.path.relpath(path, self.base).replace(os.sep, "/")
+        line = dict(entry, rows=records_to_json(entry["rows"]), path=rel)
+        offset = f.tell()
+        f.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+        indexed = {key: value for key, value in entry.items() if key != "rows"}
+        indexed["offset"] = offset
+        return indexed
+
+    def _start(self, path: str):
+        f = open(path, "wb")
+        f.write((json.dumps(self.header) + "\n").encode("utf-8"))
+        return f
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+class Journal(PageLog):
+    """Append-only checkpoint of the pages a run has finished.
+
+    Each page's manifest entry (size, mtime, hash, rows, stats) is appended
+    and flushed as soon as the page is done. If the run is interrupted, the
+    next run over the same pages finds the journal and reuses those entries.
+    It does not reread or reparse those pages, and discard() removes the
+    journal once the outputs are written.
+    """
+
+    VERSION = 3
+
+    def __init__(self, path: str, backend: str):
+        super().__init__(path, {"version": self.VERSION, "backend": backend, "parser": parser_version()})
+        self.entries: Dict[str, Dict] = self._load()
+        if self.entries:
+            self._file = open(path, "r+b")
+            # Drop a line torn by a hard kill, so new entries start on a line of their own
+            self._file.truncate(self._good_end)
+            self._file.seek(self._good_end)
+        else:
+            self._file = self._start(path)
+        self._file.flush()
+
+    def append(self, path: str, entry: Dict) -> None:
+        self._write(self._file, path, entry)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+    def discard(self) -> None:
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def journal_path(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + "_Journal.jsonl"
+
+
+# Serial runs read pages ahead on a few threads while the current one is parsed
+PREFETCH_THREADS = 2
+PREFETCH_DEPTH = 4
+# With --jobs, pages submitted to the pool ahead of the next one to yield, per worker
+PARSE_WINDOW_PER_JOB = 4
+
+
+def _read_page(path: str) -> Tuple[Optional[bytes], int, int]:
+    t0 = time.perf_counter_ns()
+    data = read_html_bytes(path)
+    return data, t0, time.perf_counter_ns()
+
+
+def manifest_path(out_path: str) -> str:
+    """The incremental-run manifest is kept next to the workbook it was built for."""
+    return os.path.splitext(out_path)[0] + "_Manifest.jsonl"
+
+
+MANIFEST_VERSION = 4
+
+
+class Manifest(PageLog):
+    """Entries of the previous run's pages, for reusing the rows of unchanged ones.
+
+    entries indexes the manifest on disk (empty when it is missing,
+    unreadable, built with another backend or parser version, or ignored
+    with force). add()
+    writes the entries of the current run to a new file as the pages come
+    in, and save() puts that file in place of the old one and makes it the
+    index for the next run.
+    """
+
+    def __init__(self, path: str, backend: str, force: bool = False):
+        super().__init__(path, {"version": MANIFEST_VERSION, "backend": backend, "parser": parser_version()})
+        self.entries: Dict[str, Dict] = {} if force else self._load()
+        self._next: Optional[Dict[str, Dict]] = None
+        self._file = None
+
+    def add(self, path: str, entry: Dict) -> None:
+        if self._file is None:
+            self._file = self._start(self.path + ".tmp")
+            self._next = {}
+        self._next[path] = self._write(self._file, path, entry)
+
+    def save(self) -> None:
+        try:
+            if self._file is None:
+                self._file = self._start(self.path + ".tmp")
+                self._next = {}
+            self._file.close()
+            self.close()
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"Error writing manifest {self.path}: {e}")
+        else:
+            self.entries = self._next
+        self._file = None
+        self._next = None
+
+
+def page_state(path: str, entry: Optional[Dict] = None) -> Optional[Dict]:
+    """Size and mtime of a page, or None if it cannot be stat'ed. When both
+    match entry its content hash is carried over; otherwise the page is not
+    read here, and the hash is taken when it is read for parsing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    state = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        state["sha256"] = entry.get("sha256")
+    return state
+
+
+# Bump when the extraction logic changes in a way the keyword tables don't show
+HEURISTICS_REVISION = 1
+
+
+@functools.lru_cache(maxsize=None)
+def parser_version() -> str:
+    """Fingerprint of the extraction heuristics: the revision above plus the
+    category, stage and threat keyword tables and the stored record fields.
+    Editing THREAT_VARIANTS, STAGE_KEYWORDS or ImageRecord.PARSED yields a new
+    version, so older cache entries stop matching."""
+    blob = json.dumps([
+        HEURISTICS_REVISION,
+        ImageRecord.PARSED,
+        CATEGORY_LABELS,
+        STAGE_KEYWORDS,
+        STAGE_MAX_LENGTH,
+        [(category, [(p.pattern, p.flags) for p in patterns]) for category, patterns in THREAT_VARIANTS.items()],
+    ])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class ParseCache:
+    """Content-addressed store of parse results, shared by any number of trees.
+
+    Rows and stats are kept in a SQLite file under the page's sha256 plus the
+    backend and parser_version(). Once the stored rows exceed max_bytes the
+    least recently used entries are evicted.
+
+    Every statement commits on its own, so runs sharing the file never hold
+    its write lock between pages. A failed lookup or store (another process
+    holding the lock too long, a damaged file) is treated as a miss: the
+    page is parsed and the run goes on.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.errors = 0
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    @staticmethod
+    def key(sha256: str, backend: str) -> str:
+        return f"{parser_version()}:{backend}:{sha256}"
+
+    def get(self, sha256: str, backend: str) -> Optional[Tuple[List[ImageRecord], Dict[str, int]]]:
+        """The stored rows and stats, or None when there are none or they cannot
+        be read. Hits and misses are counted by the caller (see process_pages),
+        as pool workers look pages up on caches of their own."""
+        key = self.key(sha256, backend)
+        try:
+            row = self._db.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            self.errors += 1
+            row = None
+        if row is None:
+            return None
+        try:
+            self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+        except sqlite3.Error:
+            self.errors += 1  # only the eviction order suffers
+        data = json.loads(row[0])
+        return records_from_json(data["rows"]), data["stats"]
+
+    def put(self, sha256: str, backend: str, rows: List[ImageRecord], stats: Dict[str, int]) -> None:
+        data = json.dumps({"rows": records_to_json(rows), "stats": stats}, ensure_ascii=False)
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, data, size, last_used) VALUES (?, ?, ?, ?)",
+                (self.key(sha256, backend), data, len(data), time.time_ns()),
+            )
+        except sqlite3.Error:
+            self.errors += 1
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the store is within max_bytes."""
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                drop: List[str] = []
+                for key, size in self._db.execute("SELECT key, size FROM results ORDER BY last_used"):
+                    if total <= self.max_bytes:
+                        break
+                    drop.append(key)
+                    total -= size
+                self._db.executemany("DELETE FROM results WHERE key = ?", [(key,) for key in drop])
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            self.errors += 1
+            return
+        self.evicted += len(drop)
+
+    def invalidate(self) -> int:
+        """Remove every entry; returns how many there were."""
+        count = self._db.execute("DELETE FROM results").rowcount
+        self._db.execute("VACUUM")
+        return count
+
+    def close(self) -> None:
+        self.evict()
+        self._db.close()
+
+
+def prefetch_pages(
+    files: List[str], depth: int = PREFETCH_DEPTH, threads: int = PREFETCH_THREADS, metrics: Optional[Dict[str, int]] = None
+) -> Iterator[Optional[bytes]]:
+    """Read pages on a small thread pool, yielding their bytes in the order of files.
+
+    At most depth pages are in flight or waiting ahead of the consumer; the
+    next read is only queued when the consumer takes one, so memory stays
+    bounded however many pages there are. If a metrics dict is given, the
+    read stage's busy/idle time and the consumer's wait time are added to it.
+    """
+    pending: deque = deque()
+    paths = iter(files)
+    t_start = time.perf_counter_ns()
+    read_busy = wait = 0
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for path in itertools.islice(paths, depth):
+            pending.append(pool.submit(_read_page, path))
+        while pending:
+            t0 = time.perf_counter_ns()
+            data, started, finished = pending.popleft().result()
+            wait += time.perf_counter_ns() - t0
+            read_busy += finished - started
+            path = next(paths, None)
+            if path is not None:
+                pending.append(pool.submit(_read_page, path))
+            yield data
+    if metrics is not None:
+        elapsed = time.perf_counter_ns() - t_start
+        metrics["read_busy_ns"] = metrics.get("read_busy_ns", 0) + read_busy
+        # Reader threads are idle when the buffer is full (backpressure) or input has run out
+        metrics["read_idle_ns"] = metrics.get("read_idle_ns", 0) + max(0, threads * elapsed - read_busy)
+        metrics["parse_wait_ns"] = metrics.get("parse_wait_ns", 0) + wait
+
+
+def parse_pages(
+    files: List[str],
+    backend: str,
+    jobs: int = 1,
+    timings: Optional[Dict[str, float]] = None,
+    prefetch: int = PREFETCH_DEPTH,
+    metrics: Optional[Dict[str, int]] = None,
+    cache: Optional[ParseCache] = None,
+) -> Iterator[PageResult]:
+    """Read and parse pages, yielding their PageResult in the order of files.
+    Each page is read once; with a cache, pages it holds are not parsed.
+
+    Serially, pages are read ahead by prefetch_pages (prefetch = read-ahead
+    depth, 0 to read each page just before parsing it). With jobs > 1 the
+    pages go to a process pool through a window of PARSE_WINDOW_PER_JOB pages
+    per worker ahead of the next page to yield. Each batch admitted to the
+    window is submitted largest first (see schedule_largest_first), so no big
+    page is left running alone at the end of it. Each worker reads its own
+    pages, so reads already overlap other workers' parsing. Results are
+    always yielded in input order, so the output matches a serial run
+    exactly, and at most one window of results waits to be yielded.
+    """
+    if (jobs <= 1 or len(files) <= 1) and prefetch <= 0:
+        for path in files:
+            yield parse_page_data(read_html_bytes(path), backend, cache)
+        return
+    if jobs <= 1 or len(files) <= 1:
+        for data in prefetch_pages(files, prefetch, metrics=metrics):
+            t0 = time.perf_counter_ns()
+            result = parse_page_data(data, backend, cache)
+            if metrics is not None:
+                metrics["parse_busy_ns"] = metrics.get("parse_busy_ns", 0) + time.perf_counter_ns() - t0
+            yield result
+        return
+    tasks = [(path, backend, cache.path if cache is not None else None) for path in files]
+    jobs = min(jobs, len(tasks))
+    rank = {i: position for position, i in enumerate(schedule_largest_first(files, timings))}
+    window = jobs * PARSE_WINDOW_PER_JOB
+    futures: Dict[int, Future] = {}
+    admitted = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for next_index in range(len(tasks)):
+            # Refill in batches once half the window is yielded, so the largest
+            # page of a batch still starts first
+            if admitted < len(tasks) and admitted - next_index <= window // 2:
+                batch = range(admitted, min(len(tasks), next_index + window))
+                for i in sorted(batch, key=rank.__getitem__):
+                    futures[i] = pool.submit(_parse_page, tasks[i])
+                admitted = batch.stop
+            yield futures.pop(next_index).result()
+
+
+def print_page_stats(stats: Dict[str, int], totals: Dict[str, int]) -> None:
+    """Print the counters of one parsed page and add its pre-filter figures to totals."""
+    totals["pages_skipped"] = totals.get("pages_skipped", 0) + stats.get("dom_skipped", 0)
+    totals["bytes_avoided"] = totals.get("bytes_avoided", 0) + stats.get("bytes_avoided", 0)
+    fallback = " (latin-1 fallback)" if stats.get("latin1_fallback") else ""
+    print(f"  read {stats.get('bytes_read', 0)} byte(s), encoding check {stats.get('decode_ns', 0) / 1e6:.2f} ms{fallback}")
+    if stats.get("dom_skipped"):
+        print("  nothing to extract, DOM parsing skipped")
+    else:
+        print(f"  text cache: {stats.get('text_cache_hits', 0)} hit(s), {stats.get('text_cache_misses', 0)} miss(es)")
+
+
+def process_pages(
+    files: List[str],
+    backend: str,
+    totals: Dict[str, int],
+    jobs: int = 1,
+    timings: Optional[Dict[str, float]] = None,
+    prefetch: int = PREFETCH_DEPTH,
+    manifest: Optional[Manifest] = None,
+    cache: Optional[ParseCache] = None,
+    prefix: str = PAGE_PREFIX,
+    journal: Optional[Journal] = None,
+) -> Iterator[Tuple[str, List[ImageRecord]]]:
+    """Parse the <prefix>*.html pages and yield (path, image rows) per page, in the given order.
+
+    timings holds historical parse times (ms, by absolute path) used for
+    scheduling; it is updated with this run's measurements. Pipeline stage
+    times (see prefetch_pages) are added to totals.
+    manifest holds the size, mtime, hash, rows and stats of earlier runs (by
+    absolute path); pages whose size and mtime are unchanged reuse their rows
+    instead of being read and parsed. The given files are added to it as they are yielded.
+    cache, when given, supplies rows for pages whose content it has seen
+    before (in any tree) and receives the rows of every page parsed here.
+    journal, when given, checkpoints every page as it is finished; pages it
+    already holds from an interrupted run are reused like manifest entries.
+    """
+    files = [path for path in files if species_for_page(os.path.basename(path), prefix) is not None]
+    states: Dict[str, Optional[Dict]] = {}
+    # Reused pages are only noted here; their rows are loaded when the page's
+    # turn comes, so just one page's rows are held at a time. Pages are only
+    # stat'ed up front: a page whose size and mtime match its entry is reused,
+    # any other is read once, by the parse stage, which also hashes it.
+    reused: Dict[str, Tuple[PageLog, Dict]] = {}
+    for path in files:
+        key = os.path.abspath(path)
+        source = journal if journal is not None and key in journal.entries else manifest
+        entry = source.entries.get(key) if source is not None else None
+        states[key] = page_state(path, entry)
+        if entry and states[key] and states[key].get("sha256"):
+            reused[key] = (source, entry)
+    stale = [path for path in files if os.path.abspath(path) not in reused]
+    history = dict(timings) if timings is not None else None
+    parsed = parse_pages(stale, backend, jobs, history, prefetch, totals, cache)
+    totals["pages_reused"] = totals.get("pages_reused", 0) + len(reused)
+    for path in files:
+        key = os.path.abspath(path)
+        filename = os.path.basename(path)
+        species = species_for_page(filename, prefix)
+        if key in reused:
+            source, entry = reused[key]
+            rows = source.rows(entry)
+            if manifest is not None:
+                manifest.add(key, dict(states[key], rows=rows, stats=entry["stats"]))
+            print(f"Reusing {filename} (species: {species}) ... unchanged")
+        else:
+            rows, stats, sha256, hit = next(parsed)
+            # A page that could not be read (or stat'ed) is not recorded anywhere
+            state = dict(states[key], sha256=sha256) if states[key] and sha256 else None
+            if cache is not None and sha256:
+                if hit:
+                    cache.hits += 1
+                else:
+                    cache.misses += 1
+            if hit:
+                totals["pages_cached"] = totals.get("pages_cached", 0) + 1
+                print(f"Reusing {filename} (species: {species}) ... cached")
+            else:
+                totals["pages_parsed"] = totals.get("pages_parsed", 0) + 1
+                parse_ms = stats.get("parse_ns", 0) / 1e6
+                if timings is not None:
+                    timings[key] = parse_ms
+                if cache is not None and state:
+                    cache.put(sha256, backend, rows, stats)
+                print(f"Processing {filename} (species: {species}) ... {parse_ms:.1f} ms")
+                print_page_stats(stats, totals)
+            if manifest is not None and state:
+                manifest.add(key, dict(state, rows=rows, stats=stats))
+            if journal is not None and state:
+                journal.append(key, dict(state, rows=rows, stats=stats))
+        # Only .jpg are kept by parsers; ensure again
+        yield path, [r for r in rows if endswith_jpg(r.thumbnail)]
+    # Run the parser generator to its end so it records its pipeline metrics
+    for _ in parsed:
+        pass
+
+
+class WorkbookWriter:
+    """Listing workbook, written through openpyxl's write-only mode: row 1
+    empty, headers in row 2, data from row 3, column A empty.
+
+    Rows go straight to the sheet XML as pages come in, so no sheet is held
+    in memory and nothing has to be shifted afterwards. The workbook is only
+    readable once close() has saved it.
+    """
+
+    def __init__(self, path: str, columns: List[str]):
+        self.path = path
+        self.count = 0
+        self._wb = Workbook(write_only=True)
+        self._sheet = self._wb.create_sheet("Images")
+        # Row 1 (empty), then the headers in row 2 from column B
+        self._sheet.append([])
+        self._sheet.append([None] + columns)
+
+    def write_page(self, records: List[ImageRecord]) -> None:
+        for record in records:
+            # Column A stays empty; empty fields are left as blank cells
+            self._sheet.append([None] + [value or None for value in record.values()])
+        self.count += len(records)
+
+    def close(self) -> int:
+        self._wb.save(self.path)
+        print(f"Wrote {self.count} rows to {self.path}")
+        print("Excel structure: Row 1 (empty), Row 2 (headers), Row 3+ (data)")
+        return self.count
+
+
+class StreamWriter(abc.ABC):
+    """Line-oriented listing file that is appended to and flushed once per page.
+
+    Each page's lines go out in one write, so a consumer following the file
+    (tail -f) only ever sees whole lines and can use the rows of the pages
+    finished so far while the run goes on. Subclasses format the records
+    in write_records().
+    """
+
+    def __init__(self, path: str, columns: List[str]):
+        self.path = path
+        self.columns = columns
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._buffer = io.StringIO()
+        self.start()
+        self._flush()
+
+    def start(self) -> None:
+        """Write the lines that come before the first record."""
+
+    @abc.abstractmethod
+    def write_records(self, records: List[ImageRecord]) -> None:
+        """Format one page's records into the buffer."""
+
+    def write_page(self, records: List[ImageRecord]) -> None:
+        self.write_records(records)
+        self.count += len(records)
+        self._flush()
+
+    def _flush(self) -> None:
+        self._file.write(self._buffer.getvalue())
+        self._file.flush()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def close(self) -> int:
+        self._file.close()
+        print(f"Wrote {self.count} rows to {self.path}")
+        return self.count
+
+
+class CsvWriter(StreamWriter):
+    """CSV listing: a header line with the column names, then one line per image."""
+
+    def start(self) -> None:
+        self._csv = csv.writer(self._buffer)
+        self._csv.writerow(self.columns)
+
+    def write_records(self, records: List[ImageRecord]) -> None:
+        self._csv.writerows(record.values() for record in records)
+
+
+class JsonlWriter(StreamWriter):
+    """JSON Lines listing: one object per image keyed by column name, empty fields as null."""
+
+    def write_records(self, records: List[ImageRecord]) -> None:
+        columns = self.columns
+        for record in records:
+            values = [value or None for value in record.values()]
+            self._buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False) + "\n")
+
+
+class ColumnarWriter:
+    """Parquet file or Arrow IPC file (fmt "parquet" or "arrow") with the
+    workbook's columns; empty fields are nulls, as they are blank cells in the
+    workbook. DICTIONARY_COLUMNS are dictionary-encoded.
+
+    The columns are collected page by page and written as one table by
+    close(), so unlike the other writers this one grows with the listing.
+    The Arrow file is uncompressed so readers can memory-map it
+    (pyarrow.ipc.open_file(pyarrow.memory_map(path))) without copying. The
+    file is written under a temporary name and then renamed into place, so a
+    reader never maps a half-written file.
+    """
+
+    def __init__(self, path: str, columns: List[str], fmt: str):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.count = 0
+        # Values of the columns backed by a record field; the others are all null
+        self._values: Dict[str, List[Optional[str]]] = {
+            column: [] for column in columns if column in ImageRecord.COLUMN_FIELDS
+        }
+
+    def write_page(self, records: List[ImageRecord]) -> None:
+        for column, values in self._values.items():
+            field = ImageRecord.COLUMN_FIELDS[column]
+            values.extend([getattr(record, field) or None for record in records])
+        self.count += len(records)
+
+    def close(self) -> int:
+        import pyarrow as pa
+
+        arrays = []
+        for column in self.columns:
+            if column in self._values:
+                array = pa.array(self._values.pop(column), pa.string())
+            else:
+                array = pa.nulls(self.count, pa.string())
+            if column in DICTIONARY_COLUMNS:
+                array = array.dictionary_encode()
+            arrays.append(array)
+        table = pa.Table.from_arrays(arrays, names=self.columns)
+
+        tmp = self.path + ".tmp"
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp, use_dictionary=[c for c in self.columns if c in DICTIONARY_COLUMNS])
+        else:
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, self.path)
+        print(f"Wrote {self.count} rows to {self.path}")
+        return self.count
+
+
+def listing_dataframe(rows: Iterable[Tuple[str, ...]], columns: List[str]):
+    """pandas DataFrame of listing rows (ImageRecord.values() tuples), as
+    written by --export pickle.
+
+    pandas is only imported here, so the listing runs themselves neither
+    need it installed nor pay for importing it.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        raise RuntimeError("DataFrame output needs pandas (pip install pandas)") from None
+    return pd.DataFrame.from_records(list(rows), columns=columns)
+
+
+class DataFrameWriter:
+    """Pickled pandas DataFrame with the workbook's columns, for loading the
+    listing with pandas.read_pickle(). Like ColumnarWriter it keeps the rows
+    until close(), which builds the frame and renames it into place.
+    """
+
+    def __init__(self, path: str, columns: List[str]):
+        self.path = path
+        self.columns = columns
+        self.count = 0
+        self._rows: List[Tuple[str, ...]] = []
+
+    def write_page(self, records: List[ImageRecord]) -> None:
+        self._rows.extend(record.values() for record in records)
+        self.count += len(records)
+
+    def close(self) -> int:
+        frame = listing_dataframe(self._rows, self.columns)
+        self._rows = []
+        tmp = self.path + ".tmp"
+        frame.to_pickle(tmp, compression=None)
+        os.replace(tmp, self.path)
+        print(f"Wrote {self.count} rows to {self.path}")
+        return self.count
+
+
+def open_writers(out_base: str, columns: List[str], exports: Iterable[str] = ()) -> List:
+    """The workbook writer for out_base + ".xlsx", then one writer per export format."""
+    writers = [WorkbookWriter(out_base + ".xlsx", columns)]
+    for fmt in exports:
+        path = out_base + EXPORT_EXTENSIONS[fmt]
+        if fmt == "csv":
+            writers.append(CsvWriter(path, columns))
+        elif fmt == "jsonl":
+            writers.append(JsonlWriter(path, columns))
+        elif fmt == "pickle":
+            writers.append(DataFrameWriter(path, columns))
+        else:
+            writers.append(ColumnarWriter(path, columns, fmt))
+    return writers
+
+
+def write_listings(
+    pages: Iterable[Tuple[str, List[ImageRecord]]],
+    out_base: str,
+    outputs: List[Tuple[str, str]],
+    page_order: Optional[Dict[str, str]] = None,
+    exports: Iterable[str] = (),
+) -> int:
+    """Stream the parsed pages into every requested listing: its workbook plus
+    one file per requested export format (see EXPORT_EXTENSIONS).
+
+    pages is consumed one page at a time and each page's records go to all
+    the writers before the next page is taken, so nothing but the current
+    page is held here. A listing's files are created with its first record;
+    the slug (which depends on the listing's prefix) and, when page_order is
+    given, the Order column are filled into the records in place. As the
+    next listing rewrites the slug of the same records, writers that keep
+    rows past write_page() (ColumnarWriter, DataFrameWriter) copy the values
+    out there.
+    """
+    columns = LISTING_COLUMNS + (["Order"] if page_order is not None else [])
+    exports = list(exports)
+    writers: List[Optional[List]] = [None] * len(outputs)
+    for path, rows in pages:
+        if not rows:
+            continue
         filename = os.path.basename(path)
-        base = os.path.splitext(filename)[0]
-        # Must include underscore after Fotos
-        if not base.startswith("Fotos_"):
+        order = page_order[path] if page_order is not None else None
+        for i, (prefix, suffix) in enumerate(outputs):
+            species = species_for_page(filename, prefix)
+            if species is None:
+                continue
+            for r in rows:
+                r.slug = species
+                r.order = order
+            if writers[i] is None:
+                writers[i] = open_writers(out_base + os.path.splitext(suffix)[0], columns, exports)
+            for writer in writers[i]:
+                writer.write_page(rows)
+    for listing in writers:
+        if listing is None:
+            print("No image records found.")
             continue
-        species = base.split("Fotos_", 1)[1]
-        print(f"Processing {filename} (species: {species}) ...")
-        rows = parse_file(path)
-        for r in rows:
-            # Only .jpg are kept by parsers; ensure again
-            if not endswith_jpg(r.get("Thumbnail_File")):
+        for writer in listing:
+            writer.close()
+    return 0
+
+
+def print_pipeline_stats(totals: Dict[str, int]) -> None:
+    if "read_busy_ns" not in totals:
+        return
+    print(
+        f"Pipeline: read stage {totals['read_busy_ns'] / 1e6:.1f} ms busy, {totals['read_idle_ns'] / 1e6:.1f} ms idle; "
+        f"parse stage {totals.get('parse_busy_ns', 0) / 1e6:.1f} ms busy, {totals['parse_wait_ns'] / 1e6:.1f} ms stalled on reads."
+    )
+
+
+def print_reuse_summary(totals: Dict[str, int]) -> None:
+    print(
+        f"Manifest: {totals.get('pages_reused', 0)} page(s) reused, {totals.get('pages_cached', 0)} from cache, "
+        f"{totals.get('pages_parsed', 0)} page(s) parsed."
+    )
+
+
+def load_run_state(
+    out_path: str, backend: str, force: bool = False, state: Optional[Dict] = None
+) -> Tuple[Dict[str, float], Manifest]:
+    """Timings and manifest for a run. A watch loop passes the same state dict
+    every time, so they are only loaded (the manifest indexed) once and then
+    kept warm in memory."""
+    if state is not None and "manifest" in state:
+        return state["timings"], state["manifest"]
+    timings = load_timings(timings_path(out_path))
+    manifest = Manifest(manifest_path(out_path), backend, force)
+    if state is not None:
+        state.update(timings=timings, manifest=manifest)
+    return timings, manifest
+
+
+def page_sort_key(path: str, base: str) -> List:
+    """[folder parts, file name] of a page relative to base. Sorting by this key
+    gives the order of a single-host run (find_order_folders walks folders
+    depth-first in name order, find_species_pages sorts by name)."""
+    rel = os.path.relpath(path, base).split(os.sep)
+    return [rel[:-1], rel[-1]]
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """argparse type for --shard i/N (1 <= i <= N)."""
+    try:
+        i, n = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if not 1 <= i <= n:
+        raise argparse.ArgumentTypeError(f"shard {i}/{n} out of range (1 <= i <= N)")
+    return i, n
+
+
+def select_shard(files: List[str], base: str, shard: Tuple[int, int], by: str = "hash") -> List[str]:
+    """The pages of one shard, in their original order.
+
+    "hash" assigns each page by a stable hash of its path relative to base, so
+    adding a page never moves the others. "size" deals pages out largest first
+    to the least loaded shard, which balances the bytes per shard. Every host
+    computes the same split as long as it sees the same tree.
+    """
+    i, n = shard
+    keys = [os.path.relpath(path, base).replace(os.sep, "/") for path in files]
+    if by == "size":
+        loads = [0] * n
+        owner: Dict[str, int] = {}
+        sizes = {path: os.path.getsize(path) for path in files}
+        for path, key in sorted(zip(files, keys), key=lambda pk: (-sizes[pk[0]], pk[1])):
+            target = min(range(n), key=lambda k: loads[k])
+            owner[path] = target
+            loads[target] += sizes[path]
+        return [path for path in files if owner[path] == i - 1]
+    return [
+        path for path, key in zip(files, keys)
+        if int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % n == i - 1
+    ]
+
+
+def shard_suffix(shard: Optional[Tuple[int, int]]) -> str:
+    return f"_Shard{shard[0]}of{shard[1]}" if shard else ""
+
+
+PARTIAL_VERSION = 3
+
+
+def run_key(header: Dict) -> Tuple:
+    """What the partials of one sharded run share: the listing, the shard
+    count and split, and the backend and parser that produced the rows."""
+    return (header["name"], header["listing"], header["root"], header["shard"][1],
+            header["shard_by"], header["backend"], header["parser"])
+
+
+def write_partial(
+    path: str,
+    header: Dict,
+    pages: Iterable[Tuple[str, List[ImageRecord]]],
+    base: str,
+    page_order: Optional[Dict[str, str]] = None,
+) -> int:
+    """Write a shard's parsed pages as JSON lines (a header, then one page per
+    line in page_sort_key order) for --merge to combine.
+
+    Each page is written as it arrives, so pages must already come in
+    page_sort_key order, as the discovered files do. The lines go to a
+    .tmp file that replaces path once the shard is complete."""
+    tmp = path + ".tmp"
+    written = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(dict(header, version=PARTIAL_VERSION), ensure_ascii=False) + "\n")
+        for page, rows in pages:
+            entry = {"key": page_sort_key(page, base), "path": page,
+                     "order": page_order[page] if page_order else None, "rows": records_to_json(rows)}
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            written += 1
+    os.replace(tmp, path)
+    print(f"Wrote {written} page(s) to partial {path}")
+    return 0
+
+
+def read_partial(path: str) -> Tuple[Dict, Iterator[Dict]]:
+    """Header and a lazy iterator over the page entries of a partial."""
+    f = open(path, "r", encoding="utf-8")
+    header = json.loads(f.readline())
+
+    def entries() -> Iterator[Dict]:
+        with f:
+            for line in f:
+                yield json.loads(line)
+    return header, entries()
+
+
+def merge_partials(paths: List[str], exports: Iterable[str] = ()) -> int:
+    """k-way merge the partials of a sharded run into the final listing(s),
+    in the same order a single-host run produces. The workbooks are written
+    next to the first partial."""
+    partials = [read_partial(path) for path in paths]
+    headers = [header for header, _ in partials]
+    first = headers[0]
+    for path, header in zip(paths, headers):
+        if header.get("version") != PARTIAL_VERSION:
+            print(f"Error: {path} is not a partial listing of this version.")
+            return 1
+        if run_key(header) != run_key(first):
+            print(f"Error: {path} belongs to a different run than {paths[0]}.")
+            return 1
+    seen_shards: Dict[int, str] = {}
+    for path, header in zip(paths, headers):
+        index = header["shard"][0]
+        if index in seen_shards:
+            print(f"Error: {path} and {seen_shards[index]} are both shard {index}.")
+            return 1
+        seen_shards[index] = path
+    n = first["shard"][1]
+    missing = sorted(set(range(1, n + 1)) - {header["shard"][0] for header in headers})
+    if missing:
+        print(f"Warning: shard(s) {', '.join(map(str, missing))} of {n} missing; the listing will be incomplete.")
+
+    page_order: Dict[str, str] = {}
+    # By page_sort_key (relative to the root), as each host has its own absolute paths
+    seen: Set[Tuple[Tuple[str, ...], str]] = set()
+    merged = 0
+    duplicates = 0
+
+    def pages() -> Iterator[Tuple[str, List[ImageRecord]]]:
+        # Streamed into the writers, one page at a time
+        nonlocal merged, duplicates
+        for entry in heapq.merge(*(entries for _, entries in partials), key=lambda e: e["key"]):
+            folders, filename = entry["key"]
+            if (tuple(folders), filename) in seen:
+                duplicates += 1
                 continue
-            # Create record with new column structure
-            r_out = {
-                "Species_ID": "",  # Column B: EMPTY
-                "Slug": species,  # Column C: Species_Name values
-                "Subspecies_ID": "",  # Column D: EMPTY
-                "Slide": r.get("Is_Small_ffn_gif", ""),  # Column E: Is_Small_ffn_gif values
-                "Cover": "",  # Column F: EMPTY
-                "Thumbnail_Filename": r.get("Thumbnail_File", ""),  # Column G: Thumbnail_File values
-                "Large_Filename": r.get("Large_File", ""),  # Column H: Large_File values
-                "Equipment": r.get("Camera_Equipment", ""),  # Column I: Camera_Equipment values
-                "Sex_Age": r.get("Sex_Age", ""),  # Column J: Sex_Age values
-                "Location": "",  # Column K: EMPTY
-                "Province": "",  # Column L: EMPTY
-                "Country": "",  # Column M: EMPTY
-                "Date": "",  # Column N: EMPTY
-                "Location_Date": r.get("Location_Date", ""),  # Column O: Location_Date values
-                "Threat_Status": r.get("Threat_Status", ""),  # Column P: Threat_Status values
+            seen.add((tuple(folders), filename))
+            if entry["order"] is not None:
+                page_order[entry["path"]] = entry["order"]
+            merged += 1
+            yield entry["path"], records_from_json(entry["rows"])
+
+    out_base = os.path.join(os.path.dirname(os.path.abspath(paths[0])), first["name"])
+    result = write_listings(
+        pages(), out_base, listing_outputs(first["listing"]), page_order if first["root"] else None, exports
+    )
+    print(f"Merged {merged} page(s) from {len(paths)} partial(s).")
+    if duplicates:
+        print(f"Warning: {duplicates} page(s) appeared in more than one partial; kept the first.")
+    return result
+
+
+def collect_pages(
+    args: argparse.Namespace,
+    files: List[str],
+    base: str,
+    page_order: Optional[Dict[str, str]] = None,
+    cache: Optional[ParseCache] = None,
+    state: Optional[Dict] = None,
+) -> int:
+    """Parse the discovered pages (or this host's --shard of them) and write
+    the listing(s) to base, or the shard's partial for --merge."""
+    outputs = listing_outputs(args.listing)
+    prefix = pages_prefix(outputs)
+    name = get_folder_name(base)
+    out_base = os.path.join(base, name)
+    if args.shard:
+        files = select_shard(files, base, args.shard, args.shard_by)
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: {len(files)} file(s).")
+    sidecar = out_base + "_Image_Listing" + shard_suffix(args.shard) + ".xlsx"
+    timings, manifest = load_run_state(sidecar, args.backend, args.force, state)
+    journal = Journal(journal_path(sidecar), args.backend)
+    if journal.entries:
+        print(f"Resuming: {len(journal.entries)} page(s) already done in {journal.path}")
+
+    totals: Dict[str, int] = {}
+    parsed = process_pages(
+        files, args.backend, totals, args.jobs, timings, args.prefetch, manifest, cache, prefix, journal
+    )
+    try:
+        if args.shard:
+            header = {
+                "name": name, "listing": args.listing, "root": page_order is not None, "shard": list(args.shard),
+                "shard_by": args.shard_by, "backend": args.backend, "parser": parser_version(),
             }
-            records.append(r_out)
+            result = write_partial(os.path.splitext(sidecar)[0] + ".jsonl", header, parsed, base, page_order)
+        else:
+            # Pages go to the writers as they are parsed
+            result = write_listings(parsed, out_base, outputs, page_order, args.export)
+    finally:
+        journal.close()
+    save_timings(timings_path(sidecar), timings)
+    manifest.save()
+    print_pipeline_stats(totals)
+    print_reuse_summary(totals)
+
+    print(f"Pre-filter: {totals.get('pages_skipped', 0)} page(s) skipped, {totals.get('bytes_avoided', 0)} byte(s) not parsed.")
 
-    if not records:
-        print("No image records found.")
+    # Outputs are complete; the checkpoint is no longer needed
+    journal.discard()
+    return result
+
+
+def run_root(args: argparse.Namespace, cache: Optional[ParseCache] = None, state: Optional[Dict] = None) -> int:
+    """Crawl every order folder under args.root and write one catalog with an Order column."""
+    root = args.root
+    prefix = pages_prefix(listing_outputs(args.listing))
+    folders = find_order_folders(root, prefix)
+    if not folders:
+        print(f"No folders with species pages ({prefix}*.html) found under {root}.")
         return 0
+    print(f"Found {len(folders)} order folder(s) under {root}.")
+
+    files: List[str] = []
+    page_order: Dict[str, str] = {}
+    for folder in folders:
+        # Same naming as the per-folder run: the order is the folder's own name
+        order = get_folder_name(folder)
+        pages = find_species_pages(folder, prefix)
+        print(f"Order {order}: {len(pages)} file(s)")
+        files.extend(pages)
+        page_order.update((path, order) for path in pages)
+
+    # All orders go through one pass so the pool stays busy across folder boundaries
+    return collect_pages(args, files, root, page_order, cache, state)
+
+
+def run_folder(args: argparse.Namespace, cache: Optional[ParseCache] = None, state: Optional[Dict] = None) -> int:
+    """Collect the listing(s) of the current folder."""
+    cwd = os.getcwd()
+    prefix = pages_prefix(listing_outputs(args.listing))
+    files = find_species_pages(cwd, prefix)
+
+    if not files:
+        print(f"No matching HTML files ({prefix}*.html) found in current folder.")
+        return 0
+
+    print(f"Found {len(files)} file(s) to process.")
+    return collect_pages(args, files, cwd, None, cache, state)
+
+
+# Watch mode: changes are picked up every WATCH_POLL_SECONDS when polling, and
+# a run starts once no page has changed for WATCH_DEBOUNCE_SECONDS
+WATCH_POLL_SECONDS = 0.5
+WATCH_DEBOUNCE_SECONDS = 0.3
 
-    # Create DataFrame with new column structure
-    df = pd.DataFrame(records, columns=[
-        "Species_ID",      # Column B
-        "Slug",            # Column C
-        "Subspecies_ID",   # Column D
-        "Slide",           # Column E
-        "Cover",           # Column F
-        "Thumbnail_Filename",  # Column G
-        "Large_Filename",      # Column H
-        "Equipment",           # Column I
-        "Sex_Age",             # Column J
-        "Location",            # Column K
-        "Province",            # Column L
-        "Country",             # Column M
-        "Date",                # Column N
-        "Location_Date",       # Column O
-        "Threat_Status",       # Column P
-    ])
 
-    out_name = f"{folder_name}_Image_Listing.xlsx"
-    out_path = os.path.join(cwd, out_name)
-    
-    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-        # Write data starting from row 3 (index 2), leaving row 1 empty and headers in row 2
-        df.to_excel(writer, index=False, sheet_name="Images", startrow=0)
-        
-        # Get the workbook and worksheet
-        workbook = writer.book
-        worksheet = writer.sheets["Images"]
-
-        # Insert empty column A
-        worksheet.insert_cols(1) 
-              
-        # Insert empty row at the top (row 1)
-        worksheet.insert_rows(1)
-
-    print(f"Wrote {len(df)} rows to {out_path}")
-    print("Excel structure: Row 1 (empty), Row 2 (headers), Row 3+ (data)")
+class PageEvents:
+    """watchdog event handler that flags any change to a species page."""
+
+    # Opening and reading a page (as every run does) must not count as a change
+    CHANGE_EVENTS = ("created", "modified", "moved", "deleted", "closed")
+
+    def __init__(self, prefix: str = PAGE_PREFIX):
+        self.prefix = prefix
+        self.changed = threading.Event()
+
+    def dispatch(self, event) -> None:
+        if getattr(event, "event_type", "") not in self.CHANGE_EVENTS:
+            return
+        for path in (getattr(event, "src_path", ""), getattr(event, "dest_path", "")):
+            if path and species_for_page(os.path.basename(os.fsdecode(path)), self.prefix) is not None:
+                self.changed.set()
+
+
+def snapshot_pages(folder: str, recursive: bool = False, prefix: str = PAGE_PREFIX) -> Dict[str, Tuple[int, int]]:
+    """(mtime_ns, size) of every <prefix>*.html page in folder, or under it when recursive."""
+    snapshot: Dict[str, Tuple[int, int]] = {}
+    for page_folder in (find_order_folders(folder, prefix) if recursive else [folder]):
+        for path in find_species_pages(page_folder, prefix):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def watch(run: Callable[[], int], folder: str, recursive: bool = False, prefix: str = PAGE_PREFIX) -> int:
+    """Run once, then again after every burst of species page changes until Ctrl+C.
+
+    Uses watchdog (inotify, FSEvents, ReadDirectoryChangesW) when installed and
+    polls page mtimes otherwise. run is expected to keep its parsed state warm
+    (see load_run_state) so only the changed pages are parsed again.
+    """
+    observer = None
+    if Observer is not None:
+        events = PageEvents(prefix)
+        observer = Observer()
+        observer.schedule(events, folder, recursive=recursive)
+        observer.start()
+
+        def wait_change(timeout: float) -> bool:
+            hit = events.changed.wait(timeout)
+            if hit:
+                events.changed.clear()
+            return hit
+    else:
+        snapshot = snapshot_pages(folder, recursive, prefix)
+
+        def wait_change(timeout: float) -> bool:
+            nonlocal snapshot
+            time.sleep(timeout)
+            current = snapshot_pages(folder, recursive, prefix)
+            hit, snapshot = current != snapshot, current
+            return hit
+
+    try:
+        run()
+        print(f"Watching {folder} for page changes ({'events' if observer else 'polling'}); press Ctrl+C to stop.")
+        while True:
+            if not wait_change(WATCH_POLL_SECONDS):
+                continue
+            # Let a burst of saves settle before extracting again
+            while wait_change(WATCH_DEBOUNCE_SECONDS):
+                pass
+            t0 = time.perf_counter()
+            try:
+                run()
+            except OSError as e:
+                # e.g. the workbook is open in Excel; keep watching
+                print(f"Error writing listing: {e}")
+                continue
+            print(f"Listing updated in {time.perf_counter() - t0:.2f} s; watching for changes.")
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
     return 0
 
 
+def open_cache(args: argparse.Namespace) -> Optional[ParseCache]:
+    if not args.cache:
+        return None
+    try:
+        return ParseCache(args.cache, int(args.cache_max_mb * 1024 * 1024))
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error opening cache {args.cache}: {e}")
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.merge:
+        return merge_partials(args.merge, args.export)
+    cache = open_cache(args)
+    if args.invalidate_cache:
+        if cache is None:
+            return 1
+        print(f"Removed {cache.invalidate()} cached result(s) from {args.cache}.")
+        cache.close()
+        return 0
+    try:
+        run = run_root if args.root else run_folder
+        if args.watch:
+            # Shared across runs so unchanged pages are reused from memory
+            state: Dict = {}
+            prefix = pages_prefix(listing_outputs(args.listing))
+            return watch(lambda: run(args, cache, state), args.root or os.getcwd(), bool(args.root), prefix)
+        return run(args, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+            print(f"Cache: {cache.hits} hit(s), {cache.misses} miss(es), {cache.evicted} evicted (parser version {parser_version()}).")
+            if cache.errors:
+                print(f"Cache: {cache.errors} lookup(s) or store(s) failed and were treated as misses.")
+
+
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Checks for the extraction backends of collect_image_listing.py.
+
+Run with pytest, or directly: python test_backends.py prints the parity
+check and timings, and python test_backends.py jobs [N] times --jobs 1..N
+(default: the CPU count) over a synthetic multi-order tree.
+"""
+import contextlib
+import glob
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import collect_image_listing as cil  # noqa: E402
+from bs4.element import PageElement  # noqa: E402
+
+
+def pages():
+    return sorted(glob.glob(os.path.join(HERE, "Fotos*.html")))
+
+
+def rows(path, backend):
+    return [r.to_json() for r in cil.parse_file(path, backend=backend)]
+
+
+def test_backends_return_the_same_rows():
+    """The lxml backend returns the bs4 rows for every page of the folder."""
+    assert pages(), "no Fotos*.html pages next to the script"
+    for path in pages():
+        assert rows(path, "lxml") == rows(path, "bs4"), os.path.basename(path)
+
+
+STAGES = ("Male", "Female", "Juvenile")
+
+
+def stage_of(block):
+    # Every fourth block has no stage header, so its lookup runs back to the previous frame
+    return "" if block % 4 == 3 else STAGES[block % len(STAGES)]
+
+
+def synthetic_page(blocks, filler=0):
+    """A species page with the given number of photo blocks: a stage header
+    table (see stage_of), the 800-wide big frame and its camera and location
+    tables, with filler non-table siblings (line breaks) between each."""
+    gap = "<br>\n" * filler
+    parts = ["<html><head><title>Fotos</title></head><body>"]
+    for i in range(blocks):
+        if stage_of(i):
+            parts.append(f'<table width="800" border="1"><tr><td>{stage_of(i)}</td></tr></table>{gap}')
+        parts.append(
+            f'<table width="800" border="9"><tr><td><a href="L{i}.jpg"><img src="T{i}.jpg"></a></td></tr></table>{gap}'
+            f'<table width="800" border="1"><tr><td>Camera {i}</td></tr></table>{gap}'
+            f'<table width="800" border="1"><tr><td>Place {i} - 01-01-2020</td></tr></table>{gap}'
+            "<p>notes</p>"
+        )
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def lookup_visits(data, backend):
+    """Parse a page and return its rows plus, for every stage or camera/location
+    lookup, how many sibling nodes it visited: the tables whose text it read
+    and, with bs4, every sibling it stepped through."""
+    visits = []
+    counting = []
+
+    def counted(walk):
+        def step(self):
+            for node in walk.fget(self):
+                if counting:
+                    counting[-1] += 1
+                yield node
+        return property(step)
+
+    def text(self, node):
+        if counting:
+            counting[-1] += 1
+        return original_text(self, node)
+
+    def lookup(function):
+        def wrapper(*args, **kwargs):
+            counting.append(0)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                visits.append(counting.pop())
+        return wrapper
+
+    original_text = cil.TableIndex.text
+    originals = [(cil, name, getattr(cil, name)) for name in ("find_stage_tag_near_table", "find_following_800_text_tables")]
+    originals += [(PageElement, name, getattr(PageElement, name)) for name in ("next_siblings", "previous_siblings")]
+    originals.append((cil.TableIndex, "text", original_text))
+    try:
+        for owner, name, value in originals:
+            if owner is cil:
+                setattr(owner, name, lookup(value))
+            elif owner is PageElement:
+                setattr(owner, name, counted(value))
+        cil.TableIndex.text = text
+        found = cil.parse_html(data, backend=backend)
+    finally:
+        for owner, name, value in originals:
+            setattr(owner, name, value)
+    return found, visits
+
+
+def test_block_lookups_do_not_walk_siblings():
+    """On pages of 1,000+ blocks every block keeps its own stage, camera and
+    location, and its lookups visit the same few sibling tables however many
+    blocks the page has and however much filler lies between its tables."""
+    for backend in cil.BACKENDS:
+        per_page = {}
+        for blocks, filler in ((1000, 0), (1000, 25), (2000, 25)):
+            found, visits = lookup_visits(synthetic_page(blocks, filler), backend)
+            assert len(found) == blocks
+            for i, r in enumerate(found):
+                assert (r.thumbnail, r.large) == (f"T{i}.jpg", f"L{i}.jpg")
+                assert r.sex_age == stage_of(i)
+                assert (r.equipment, r.location_date) == (f"Camera {i}", f"Place {i} - 01-01-2020")
+            # One stage and one camera/location lookup per block, each reading
+            # at most the 3 tables it may look back over or the 2 it returns
+            assert len(visits) == 2 * blocks
+            assert max(visits) <= 3, (backend, blocks, filler, max(visits))
+            per_page[blocks, filler] = sum(visits) / blocks
+        assert per_page[1000, 0] == per_page[1000, 25] == per_page[2000, 25], (backend, per_page)
+
+
+def extraction_ms(data, backend, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        found = cil.parse_html(data, backend=backend)
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+
+# The "LABEL : X" suffix the old fallback appended to every variant on each call
+MARKER_SUFFIX = r"\s*[:\-]?\s*[xX×]"
+
+
+def variant_loop_match(text, suffix=""):
+    """The matching THREAT_MATCHER replaced: every THREAT_VARIANTS pattern in
+    turn, recompiled with the suffix for the "LABEL : X" form."""
+    for canonical, patterns in cil.THREAT_VARIANTS.items():
+        for pat in patterns:
+            if re.search(pat.pattern + suffix, text, flags=re.IGNORECASE) if suffix else pat.search(text):
+                return canonical
+    return ""
+
+
+def page_texts():
+    """Compact text of every table, row and cell of this folder's pages."""
+    texts = []
+    for path in pages():
+        index = cil.build_table_index(cil.read_html_bytes(path))
+        for entry in index.entries:
+            texts.append(entry.text)
+            for tr in index.rows(entry.node):
+                texts.append(index.text(tr))
+                texts.extend(index.text(td) for td in index.cells(tr))
+    return texts
+
+
+def test_threat_matchers_agree_with_variant_loops():
+    for text in page_texts():
+        assert cil._match_threat_in_text(text) == variant_loop_match(text), text
+        assert cil._match_threat_in_text(text, cil.THREAT_MARKER_MATCHER) == variant_loop_match(text, MARKER_SUFFIX), text
+
+
+def synthetic_tree(root, orders, copies):
+    """An --root tree of order folders, each holding copies of this folder's pages."""
+    for order in range(orders):
+        folder = os.path.join(root, f"Order{order:02d}")
+        os.makedirs(folder)
+        for copy in range(copies):
+            for path in pages():
+                stem = os.path.splitext(os.path.basename(path))[0]
+                shutil.copyfile(path, os.path.join(folder, f"{stem}{copy}.html"))
+
+
+def jobs_benchmark(max_jobs, orders=8, copies=4):
+    """Time --root --force runs over a synthetic tree for --jobs 1..max_jobs,
+    checking that every job count writes the same listing."""
+    with tempfile.TemporaryDirectory() as root:
+        synthetic_tree(root, orders, copies)
+        print(f"{orders} order(s) x {copies * len(pages())} page(s), {os.cpu_count()} CPU(s)")
+        serial = reference = None
+        for jobs in range(1, max_jobs + 1):
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                cil.main(["--root", root, "--jobs", str(jobs), "--force", "--export", "csv"])
+                elapsed = time.perf_counter() - t0
+            with open(glob.glob(os.path.join(root, "*_Image_Listing.csv"))[0], encoding="utf-8") as f:
+                listing = f.read()
+            if reference is None:
+                serial, reference = elapsed, listing
+            elif listing != reference:
+                sys.exit(f"--jobs {jobs}: listing differs from --jobs 1")
+            print(f"--jobs {jobs}: {elapsed:.2f} s, {serial / elapsed:.2f}x")
+
+
+def print_parity():
+    total = 0
+    for path in pages():
+        bs4_rows, lxml_rows = rows(path, "bs4"), rows(path, "lxml")
+        status = "ok" if bs4_rows == lxml_rows else "MISMATCH"
+        print(f"{os.path.basename(path)}: {len(bs4_rows)} row(s) {status}")
+        if bs4_rows != lxml_rows:
+            sys.exit(1)
+        total += len(bs4_rows)
+    print(f"Backends agree on {total} row(s) from {len(pages())} page(s).")
+
+
+def print_matcher_timings(passes=5):
+    texts = page_texts()
+    print(f"Threat matchers over {len(texts)} page text(s), {passes} pass(es):")
+    forms = (
+        ("label", variant_loop_match, cil._match_threat_in_text),
+        ("marker", lambda t: variant_loop_match(t, MARKER_SUFFIX),
+         lambda t: cil._match_threat_in_text(t, cil.THREAT_MARKER_MATCHER)),
+    )
+    for name, old, new in forms:
+        timings = []
+        for match in (old, new):
+            t0 = time.perf_counter()
+            for _ in range(passes):
+                for text in texts:
+                    match(text)
+            timings.append((time.perf_counter() - t0) * 1000)
+        print(f"  {name} matcher: variant loops {timings[0]:.1f} ms, compiled {timings[1]:.1f} ms")
+
+
+def print_block_timings():
+    for blocks in (250, 1000, 2000, 4000):
+        data = synthetic_page(blocks, filler=25)
+        timings = ", ".join(f"{backend} {extraction_ms(data, backend)[0]:.1f} ms" for backend in cil.BACKENDS)
+        print(f"{blocks} synthetic blocks: {timings}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["jobs"]:
+        jobs_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1)
+    else:
+        print_parity()
+        print_matcher_timings()
+        print_block_timings()